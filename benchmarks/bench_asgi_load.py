@@ -0,0 +1,107 @@
+"""
+Prueba de carga en proceso sobre la aplicación ASGI: compara el listado síncrono
+(ViewSet de DRF, que ASGI ejecuta en un hilo por petición) con las vistas async
+(/api/async/...) a la misma concurrencia.
+
+Crea una base de datos de prueba (como `manage.py test`), la llena con datos
+sintéticos y envía las peticiones directamente a django_crud_api.asgi.application:
+
+    python benchmarks/bench_asgi_load.py [--rows 2000] [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases  # noqa: E402
+
+from customers.models import Customer  # noqa: E402
+from django_crud_api.asgi import application  # noqa: E402
+from products.models import Product  # noqa: E402
+
+
+def seed(rows):
+    Product.objects.bulk_create(
+        Product(name=f'Producto {i}', description='Descripción', price=decimal.Decimal(i) / 100, stock=i % 50)
+        for i in range(1, rows + 1)
+    )
+    Customer.objects.bulk_create(
+        Customer(first_name=f'Nombre {i}', last_name=f'Apellido {i % 300}', email=f'cliente{i}@example.com')
+        for i in range(1, rows + 1)
+    )
+
+
+async def request(path, query):
+    """Envía un GET a la aplicación ASGI y devuelve el código de estado."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    sent = False
+    status = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Future()  # sin desconexión del cliente
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def load(path, query, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await request(path, query)
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    assert set(statuses) == {200}, f'{path}: respuestas {set(statuses)}'
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--query', default='page_size=50')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        seed(args.rows)
+        for name in ('products', 'customers'):
+            # Sin la caché del catálogo, para comparar el trabajo real de cada vista.
+            with override_settings(PRODUCT_CACHE_TIMEOUT=0):
+                sync_rps = asyncio.run(load(f'/api/{name}/', args.query, args.requests, args.concurrency))
+                async_rps = asyncio.run(load(f'/api/async/{name}/', args.query, args.requests, args.concurrency))
+            print(f'{name:<10} sync: {sync_rps:8.1f} req/s   async: {async_rps:8.1f} req/s   x{async_rps / sync_rps:.2f}')
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Suite de rendimiento de los endpoints de la API: ejecuta cada acción de los
+viewsets de clientes, productos y órdenes con el cliente de pruebas de Django
+(toda la pila WSGI en proceso, con autenticación JWT real) y reporta en JSON, por
+acción, la latencia p50/p95/p99, las queries por petición y el RSS máximo del
+proceso, para comparar ejecuciones.
+
+Por defecto crea una base de datos de prueba (como `manage.py test`) y la llena
+con `manage.py seed_data`:
+
+    python benchmarks/bench_endpoints.py [--customers 10000] [--products 2000] [--orders 20000]
+                                         [--requests 200] [--seed 0] [--output resultados.json]
+
+Con --existing-db se usa la base configurada tal como está (ej. poblada antes con
+`manage.py seed_data --customers 1000000 --orders 2000000`). Ojo: las acciones de
+escritura crean, modifican y eliminan filas en ella.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from customers.models import Customer  # noqa: E402
+from django_crud_api.middleware import QueryCounter, execute_wrapper_all  # noqa: E402
+from orders.models import Order, OrderItem  # noqa: E402
+from products.models import Product  # noqa: E402
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa kilobytes; macOS, bytes.
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Suite:
+
+    def __init__(self, rng):
+        self.rng = rng
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        self.customer_ids = list(Customer.objects.values_list('pk', flat=True))
+        # Productos con stock de sobra para las órdenes que se crean durante la medición.
+        self.product_ids = list(Product.objects.filter(is_active=True, stock__gte=100).values_list('pk', flat=True))
+        self.order_ids = list(Order.objects.values_list('pk', flat=True))
+        self.serial = 0
+
+    def pick(self, ids):
+        return self.rng.choice(ids)
+
+    def unique(self):
+        self.serial += 1
+        return f'{os.getpid()}-{self.serial}'
+
+    def order_payload(self):
+        products = self.rng.sample(self.product_ids, min(3, len(self.product_ids)))
+        return {
+            'customer': self.pick(self.customer_ids),
+            'items': [{'product_id': pk, 'quantity': self.rng.randint(1, 3)} for pk in products],
+        }
+
+    def new_customers(self, count):
+        return [
+            Customer.objects.create(first_name='Bench', last_name='Borrar', email=f'borrar{self.unique()}@example.com').pk
+            for _ in range(count)
+        ]
+
+    def new_products(self, count):
+        return [Product.objects.create(name='Borrar', price='1.00', stock=1).pk for _ in range(count)]
+
+    def new_orders(self, count):
+        orders = []
+        for _ in range(count):
+            order = Order.objects.create(customer_id=self.pick(self.customer_ids), total_amount=0, status='cancelled')
+            OrderItem.objects.create(order=order, product_id=self.pick(self.product_ids), quantity=1, price_at_order=1)
+            orders.append(order.pk)
+        return orders
+
+    def scenarios(self):
+        """(endpoint, acción, método, arma(i, preparados) -> (ruta, cuerpo), prepara(n) o None, factor de peticiones)."""
+        return [
+            ('customers', 'list', 'get', lambda i, _: ('/api/customers/', None), None, 1),
+            ('customers', 'list?fields', 'get', lambda i, _: ('/api/customers/?fields=id,email&page_size=200', None), None, 1),
+            ('customers', 'retrieve', 'get', lambda i, _: (f'/api/customers/{self.pick(self.customer_ids)}/', None), None, 1),
+            ('customers', 'create', 'post', lambda i, _: ('/api/customers/', {
+                'first_name': 'Bench', 'last_name': 'Mark', 'email': f'bench{self.unique()}@example.com',
+            }), None, 1),
+            ('customers', 'partial_update', 'patch', lambda i, _: (
+                f'/api/customers/{self.pick(self.customer_ids)}/', {'city': self.rng.choice(['Santiago', 'Talca'])},
+            ), None, 1),
+            ('customers', 'destroy', 'delete', lambda i, ids: (f'/api/customers/{ids[i]}/', None), self.new_customers, 1),
+
+            ('products', 'list', 'get', lambda i, _: ('/api/products/', None), None, 1),
+            ('products', 'retrieve', 'get', lambda i, _: (f'/api/products/{self.pick(self.product_ids)}/', None), None, 1),
+            ('products', 'create', 'post', lambda i, _: ('/api/products/', {
+                'name': f'Bench {self.unique()}', 'price': '10.00', 'stock': 10,
+            }), None, 1),
+            ('products', 'partial_update', 'patch', lambda i, _: (
+                f'/api/products/{self.pick(self.product_ids)}/', {'description': f'Bench {i}'},
+            ), None, 1),
+            ('products', 'increase_stock', 'post', lambda i, _: (
+                f'/api/products/{self.pick(self.product_ids)}/increase_stock/', {'amount': 1},
+            ), None, 1),
+            ('products', 'destroy', 'delete', lambda i, ids: (f'/api/products/{ids[i]}/', None), self.new_products, 1),
+
+            ('orders', 'list', 'get', lambda i, _: ('/api/orders/', None), None, 1),
+            ('orders', 'list?expand', 'get', lambda i, _: ('/api/orders/?expand=items.product', None), None, 1),
+            ('orders', 'retrieve', 'get', lambda i, _: (f'/api/orders/{self.pick(self.order_ids)}/', None), None, 1),
+            ('orders', 'create', 'post', lambda i, _: ('/api/orders/', self.order_payload()), None, 1),
+            ('orders', 'update', 'put', lambda i, ids: (f'/api/orders/{ids[i]}/', self.order_payload()), self.new_orders, 1),
+            ('orders', 'partial_update', 'patch', lambda i, _: (
+                f'/api/orders/{self.pick(self.order_ids)}/', {'status': self.rng.choice(['pending', 'shipped'])},
+            ), None, 1),
+            ('orders', 'destroy', 'delete', lambda i, ids: (f'/api/orders/{ids[i]}/', None), self.new_orders, 1),
+            # La exportación recorre todas las órdenes: menos peticiones.
+            ('orders', 'export', 'get', lambda i, _: ('/api/orders/export/', None), None, 0.05),
+        ]
+
+    def request(self, method, path, data):
+        if data is None:
+            response = getattr(self.client, method)(path)
+        else:
+            response = getattr(self.client, method)(path, data=json.dumps(data), content_type='application/json')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def run(self, scenario, requests, warmup):
+        endpoint, action, method, build, prepare, factor = scenario
+        count = max(1, int(requests * factor))
+        warmup = min(warmup, count)
+        prepared = prepare(count + warmup) if prepare else None
+
+        latencies, queries, statuses = [], [], {}
+        for i in range(count + warmup):
+            path, data = build(i, prepared)
+            counter = QueryCounter()
+            start = time.perf_counter()
+            with execute_wrapper_all(counter):
+                status = self.request(method, path, data)
+            elapsed = time.perf_counter() - start
+            if i < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(counter.count)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        latencies.sort()
+        return {
+            'endpoint': endpoint,
+            'action': action,
+            'method': method.upper(),
+            'requests': count,
+            'status_codes': statuses,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 3),
+                'p95': round(percentile(latencies, 0.95), 3),
+                'p99': round(percentile(latencies, 0.99), 3),
+                'mean': round(statistics.fmean(latencies), 3),
+                'max': round(latencies[-1], 3),
+            },
+            'queries_per_request': {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)},
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--max-items-per-order', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=200, help="Peticiones medidas por acción.")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', default='', help="Endpoints a medir, separados por coma (ej. orders,products).")
+    parser.add_argument('--existing-db', action='store_true', help="Usar la base configurada sin crear ni poblar una de prueba.")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = None if args.existing_db else setup_databases(verbosity=0, interactive=False)
+    try:
+        if not args.existing_db:
+            call_command(
+                'seed_data', customers=args.customers, products=args.products, orders=args.orders,
+                max_items_per_order=args.max_items_per_order, seed=args.seed, stdout=open(os.devnull, 'w'),
+            )
+        suite = Suite(random.Random(args.seed))
+        only = {name for name in args.only.split(',') if name}
+        results = []
+        for scenario in suite.scenarios():
+            if only and scenario[0] not in only:
+                continue
+            result = suite.run(scenario, args.requests, args.warmup)
+            print(
+                f"{result['endpoint']:<10} {result['action']:<15} p50 {result['latency_ms']['p50']:8.2f} ms  "
+                f"p99 {result['latency_ms']['p99']:8.2f} ms  queries {result['queries_per_request']['mean']:5.1f}",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed': args.seed,
+                'rows': {
+                    'customers': Customer.objects.count(), 'products': Product.objects.count(),
+                    'orders': Order.objects.count(), 'order_items': OrderItem.objects.count(),
+                },
+                'peak_rss_mb': peak_rss_mb(),
+            },
+            'results': results,
+        }
+    finally:
+        if old_config is not None:
+            teardown_databases(old_config, verbosity=0)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: JSONRenderer/JSONParser de DRF (stdlib json) frente a FastJSONRenderer/
+FastJSONParser (orjson) sobre un listado de órdenes con la forma de OrderSerializer.
+
+    python benchmarks/bench_json_renderer.py [--orders 10000] [--items 3] [--repeat 5]
+
+Con --raw los importes y fechas se pasan como Decimal/datetime sin serializar,
+para medir también el costo del encoder de DRF sobre esos tipos.
+"""
+import argparse
+import datetime
+import decimal
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from django_crud_api.parsers import FastJSONParser  # noqa: E402
+from django_crud_api.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+
+def build_orders(count, items, raw):
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    orders = []
+    for i in range(1, count + 1):
+        order_date = start + datetime.timedelta(minutes=i, microseconds=i)
+        total = decimal.Decimal(i * items) + decimal.Decimal('0.99')
+        orders.append({
+            'id': i,
+            'customer': i % 500 + 1,
+            'order_date': order_date if raw else order_date.isoformat().replace('+00:00', 'Z'),
+            'total_amount': total if raw else str(total),
+            'status': 'pending',
+            'items': [
+                {
+                    'id': i * items + n,
+                    'product': n + 1,
+                    'quantity': n + 1,
+                    'price_at_order': decimal.Decimal('19.90') if raw else '19.90',
+                }
+                for n in range(items)
+            ],
+        })
+    return {'next': None, 'previous': None, 'results': orders}
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--items', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--raw', action='store_true')
+    args = parser.parse_args()
+
+    if orjson is None:
+        print('orjson no está instalado: FastJSONRenderer usa la stdlib y no habrá diferencia.')
+
+    data = build_orders(args.orders, args.items, args.raw)
+    content = JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == content, 'la salida no coincide con JSONRenderer'
+    print(f'payload: {args.orders} órdenes, {len(content) / 1024 / 1024:.1f} MiB')
+
+    cases = [
+        ('render', lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+        ('parse', lambda: JSONParser().parse(io.BytesIO(content)), lambda: FastJSONParser().parse(io.BytesIO(content))),
+    ]
+    for name, standard, fast in cases:
+        standard_time = best_time(standard, args.repeat)
+        fast_time = best_time(fast, args.repeat)
+        print(
+            f'{name:<7} stdlib: {standard_time * 1000:8.1f} ms   '
+            f'orjson: {fast_time * 1000:8.1f} ms   x{standard_time / fast_time:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: costo por petición de validar el mismo access token con
+JWTAuthentication de simplejwt (decodifica y verifica la firma siempre) frente a
+CachedJWTAuthentication (caché de tokens verificados).
+
+Solo mide la validación del token, sin base de datos:
+
+    python benchmarks/bench_jwt_auth.py [--requests 20000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework_simplejwt.authentication import JWTAuthentication  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from django_crud_api.authentication import CachedJWTAuthentication, token_cache  # noqa: E402
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        token_cache.clear()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    token = AccessToken()
+    token['user_id'] = '1'
+    request = APIRequestFactory().get('/api/orders/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def run(authentication):
+        def validate():
+            for _ in range(args.requests):
+                header = authentication.get_header(request)
+                authentication.get_validated_token(authentication.get_raw_token(header))
+        return validate
+
+    standard = best_time(run(JWTAuthentication()), args.repeat)
+    cached = best_time(run(CachedJWTAuthentication()), args.repeat)
+    print(f'simplejwt: {standard / args.requests * 1e6:7.1f} µs/petición')
+    print(f'caché:     {cached / args.requests * 1e6:7.1f} µs/petición   x{standard / cached:.1f}')
+
+
+if __name__ == '__main__':
+    main()
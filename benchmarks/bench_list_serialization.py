@@ -0,0 +1,99 @@
+"""
+Micro-benchmark: filas por segundo del serializador DRF frente a ValuesSerializer
+(camino rápido de API_FAST_LIST) para los listados de clientes y productos.
+
+Mide solo la serialización, en memoria y sin base de datos:
+
+    python benchmarks/bench_list_serialization.py [--rows 20000] [--repeat 5]
+"""
+import argparse
+import datetime
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from customers.models import Customer  # noqa: E402
+from customers.serializers import CustomerSerializer  # noqa: E402
+from django_crud_api.serializers import ValuesSerializer  # noqa: E402
+from products.models import Product  # noqa: E402
+from products.serializers import ProductSerializer  # noqa: E402
+
+
+def build_customers(rows):
+    now = timezone.now()
+    return [
+        Customer(
+            id=i, first_name=f'Nombre {i}', last_name=f'Apellido {i}', email=f'cliente{i}@example.com',
+            date_of_birth=datetime.date(1990, 1, 1) + datetime.timedelta(days=i % 9000),
+            city='Santiago', country='Chile', date_joined=now, last_updated=now,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def build_products(rows):
+    now = timezone.now()
+    return [
+        Product(
+            id=i, name=f'Producto {i}', description='Descripción', price=decimal.Decimal(i) / 100,
+            stock=i % 50, is_active=True, created_at=now, updated_at=now,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def as_values(instances, keys):
+    # Mismas filas que devolvería values() para esas columnas.
+    return [{key: getattr(instance, key) for key in keys} for instance in instances]
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    request = Request(APIRequestFactory().get('/'))
+    cases = [
+        ('customers', CustomerSerializer, build_customers(args.rows)),
+        ('products', ProductSerializer, build_products(args.rows)),
+    ]
+    for name, serializer_class, instances in cases:
+        serializer = serializer_class(context={'request': request})
+        compiled = ValuesSerializer.compile(serializer)
+        rows = as_values(instances, compiled.get_values_keys())
+
+        drf_data = serializer_class(instances, many=True, context={'request': request}).data
+        assert compiled.render(rows) == drf_data, f'{name}: la salida no coincide'
+
+        drf = best_time(lambda: serializer_class(instances, many=True, context={'request': request}).data, args.repeat)
+        fast = best_time(lambda: compiled.render(rows), args.repeat)
+        print(
+            f'{name:<10} serializer: {args.rows / drf:>10,.0f} filas/s   '
+            f'values: {args.rows / fast:>10,.0f} filas/s   x{drf / fast:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
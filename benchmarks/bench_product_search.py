@@ -0,0 +1,136 @@
+"""
+Benchmark de la búsqueda de productos: latencia de search_products con el índice
+del motor (FULLTEXT en MySQL, FTS5 en SQLite) frente al respaldo icontains, que
+recorre la tabla completa. Reporta en JSON, por motor y tipo de búsqueda, la
+latencia p50/p95/p99 y los resultados promedio.
+
+Por defecto crea una base de datos de prueba y la llena con `manage.py seed_data`
+(solo productos, con nombres y descripciones del vocabulario del comando):
+
+    python benchmarks/bench_product_search.py [--products 1000000] [--requests 50] [--seed 0]
+                                              [--output resultados.json]
+
+Con --existing-db se usa la base configurada tal como está (ej. MySQL ya poblado con
+`manage.py seed_data --products 1000000 --customers 0 --orders 0`).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases  # noqa: E402
+
+from orders.management.commands.seed_data import PRODUCT_ADJECTIVES, PRODUCT_MATERIALS, PRODUCT_NOUNS  # noqa: E402
+from products.models import Product  # noqa: E402
+from products.search import ContainsSearch, get_search_backend, search_products  # noqa: E402
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def query_sets(rng, count):
+    """Búsquedas por tipo: una palabra del nombre, nombre + adjetivo, material (solo en la descripción) y sin resultados."""
+    return {
+        'one_term': [rng.choice(PRODUCT_NOUNS) for _ in range(count)],
+        'two_terms': [f'{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_ADJECTIVES)}' for _ in range(count)],
+        'description': [rng.choice(PRODUCT_MATERIALS) for _ in range(count)],
+        'no_match': [f'inexistente{n}' for n in range(count)],
+    }
+
+
+def measure(backend, queries, limit):
+    latencies, hits = [], []
+    for text in queries:
+        start = time.perf_counter()
+        results = search_products(text, is_active=True, limit=limit, backend=backend)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits.append(len(results))
+    latencies.sort()
+    return {
+        'requests': len(queries),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'results_mean': round(statistics.fmean(hits), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--requests', type=int, default=50, help="Búsquedas medidas por tipo y motor.")
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--existing-db', action='store_true', help="Usar la base configurada sin crear ni poblar una de prueba.")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = None if args.existing_db else setup_databases(verbosity=0, interactive=False)
+    try:
+        if not args.existing_db:
+            call_command(
+                'seed_data', customers=0, products=args.products, orders=0, seed=args.seed,
+                stdout=open(os.devnull, 'w'),
+            )
+        rng = random.Random(args.seed)
+        searches = query_sets(rng, args.requests)
+        results = []
+        for backend in (get_search_backend(connection), ContainsSearch()):
+            # Una búsqueda previa para no medir la primera lectura de la tabla o el índice.
+            search_products(PRODUCT_NOUNS[0], limit=args.page_size, backend=backend)
+            for kind, queries in searches.items():
+                result = {'backend': backend.name, 'search': kind, **measure(backend, queries, args.page_size)}
+                print(
+                    f"{backend.name:<10} {kind:<12} p50 {result['latency_ms']['p50']:9.2f} ms  "
+                    f"p99 {result['latency_ms']['p99']:9.2f} ms",
+                    file=sys.stderr,
+                )
+                results.append(result)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed': args.seed,
+                'products': Product.objects.count(),
+                'page_size': args.page_size,
+            },
+            'results': results,
+        }
+    finally:
+        if old_config is not None:
+            teardown_databases(old_config, verbosity=0)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
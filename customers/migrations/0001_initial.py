@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Nombre')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Apellido')),
+                ('email', models.EmailField(max_length=254, unique=True, verbose_name='Correo Electrónico')),
+                ('phone_number', models.CharField(blank=True, max_length=20, null=True, verbose_name='Número de Teléfono')),
+                ('date_of_birth', models.DateField(blank=True, null=True, verbose_name='Fecha de Nacimiento')),
+                ('address_line_1', models.CharField(blank=True, max_length=255, null=True, verbose_name='Dirección Línea 1')),
+                ('address_line_2', models.CharField(blank=True, max_length=255, null=True, verbose_name='Dirección Línea 2')),
+                ('city', models.CharField(blank=True, max_length=100, null=True, verbose_name='Ciudad')),
+                ('state_province', models.CharField(blank=True, max_length=100, null=True, verbose_name='Estado/Provincia')),
+                ('postal_code', models.CharField(blank=True, max_length=20, null=True, verbose_name='Código Postal')),
+                ('country', models.CharField(default='Chile', max_length=100, verbose_name='País')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activo')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Registro')),
+                ('last_updated', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notas Adicionales')),
+            ],
+            options={
+                'verbose_name': 'Cliente',
+                'verbose_name_plural': 'Clientes',
+                'ordering': ['last_name', 'first_name', 'id'],
+            },
+        ),
+    ]
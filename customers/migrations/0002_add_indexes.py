@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='customer_name_idx'),
+        ),
+    ]
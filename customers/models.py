@@ -28,7 +28,11 @@ class Customer(models.Model):
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
-        ordering = ['last_name', 'first_name']
+        ordering = ['last_name', 'first_name', 'id']
+        indexes = [
+            # Cubre el ordenamiento por defecto y la paginación por cursor del listado.
+            models.Index(fields=['last_name', 'first_name', 'id'], name='customer_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -3,12 +3,28 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiExample
 from rest_framework.permissions import AllowAny
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Agrega username, is_staff e is_superuser a los tokens, para que
+    CachedJWTAuthentication pueda resolver permisos sin consultar la base de datos
+    (AUTH_STATELESS_USERS).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.get_username()
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
 @extend_schema_view(
     post=extend_schema(
         tags=["Autenticación"],
         summary="Obtener access y refresh token (JWT)",
         description="Autenticación vía JWT. Requiere username y password válidos.",
-        request=TokenObtainPairSerializer,
+        request=ClaimsTokenObtainPairSerializer,
         responses={200: None},
         examples=[
             OpenApiExample(
@@ -21,6 +37,7 @@ from rest_framework.permissions import AllowAny
 )
 class DecoratedTokenObtainPairView(TokenObtainPairView):
     permission_classes = [AllowAny]
+    serializer_class = ClaimsTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from django_crud_api.serializers import DynamicFieldsMixin
 from .models import Customer
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
@@ -1,11 +1,16 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext # Para inspeccionar el SQL ejecutado
 from django.utils import timezone
+from django.utils.http import http_date
 from django.core.exceptions import ValidationError # Para probar validaciones de modelos
 from django.db.utils import IntegrityError # Para probar restricciones de unicidad (email)
 
 import datetime # Para trabajar con objetos de fecha
 import time # Para el sleep en updated_at
 
+from rest_framework.test import APITestCase
+
 from .models import Customer
 
 class CustomerModelTest(TestCase):
@@ -184,3 +189,216 @@ class CustomerModelTest(TestCase):
         response = api_client.post("/api/customers/token/", data={"username": "admin", "password": "admin123"})
         assert response.status_code == 200
         assert "access" in response.data
+
+
+class CustomerPaginationTest(APITestCase):
+    """
+    Pruebas de la paginación por cursor en GET /api/customers/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Apellidos repetidos para ejercitar el desempate por first_name e id.
+        names = [('Ana', 'Díaz'), ('Ana', 'Díaz'), ('Bruno', 'Díaz'), ('Carla', 'Álvarez'),
+                 ('Diego', 'Fuentes'), ('Elena', 'Díaz'), ('Ana', 'Fuentes')]
+        for i, (first_name, last_name) in enumerate(names):
+            Customer.objects.create(
+                first_name=first_name, last_name=last_name, email=f'cliente{i}@example.com'
+            )
+        cls.expected_ids = list(Customer.objects.values_list('id', flat=True))
+
+    def _ids(self, response):
+        return [customer['id'] for customer in response.data['results']]
+
+    def test_walks_all_pages_forward_and_back(self):
+        """Recorrer las páginas con next y luego con previous entrega el orden completo."""
+        pages = []
+        url = '/api/customers/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(self._ids(response))
+            url = response.data['next']
+        self.assertEqual([pk for page in pages for pk in page], self.expected_ids)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        # Desde la última página, previous devuelve las páginas anteriores intactas.
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self._ids(response), pages[1])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self._ids(response), pages[0])
+        self.assertIsNone(response.data['previous'])
+
+    def test_deep_pages_do_not_use_offset(self):
+        """La página siguiente se obtiene filtrando por el cursor, sin OFFSET."""
+        first = self.client.get('/api/customers/?page_size=2')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data['next'])
+        self.assertNotIn('OFFSET', ctx.captured_queries[-1]['sql'].upper())
+
+    def test_page_size_is_capped(self):
+        """El page_size solicitado no puede superar API_MAX_PAGE_SIZE."""
+        with self.settings(API_MAX_PAGE_SIZE=2):
+            response = self.client.get('/api/customers/?page_size=100')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor_returns_404(self):
+        """Un cursor malformado se rechaza con 404, igual que en DRF."""
+        response = self.client.get('/api/customers/?cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class CustomerIndexTest(TestCase):
+    """
+    Verifica con EXPLAIN que los índices compuestos se usan en las consultas frecuentes.
+    """
+
+    def test_default_ordering_uses_name_index(self):
+        """El listado ordenado por (last_name, first_name, id) recorre customer_name_idx."""
+        plan = Customer.objects.all()[:10].explain()
+        self.assertIn('customer_name_idx', plan)
+
+
+class CustomerConditionalGetTest(APITestCase):
+    """
+    Pruebas de ETag / Last-Modified en GET /api/customers/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Rosa', last_name='Vera', email='rosa.vera@example.com'
+        )
+
+    def test_detail_returns_304_for_matching_etag(self):
+        """Con un ETag vigente se responde 304 con una sola query y sin serializar."""
+        url = f'/api/customers/{self.customer.id}/'
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+
+    def test_list_etag_changes_when_data_changes(self):
+        """El ETag del listado cambia al modificar o agregar clientes."""
+        etag = self.client.get('/api/customers/')['ETag']
+
+        time.sleep(0.001)
+        self.customer.city = 'Talca'
+        self.customer.save()
+        updated = self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(updated.status_code, 200)
+        self.assertNotEqual(updated['ETag'], etag)
+
+        Customer.objects.create(first_name='Tomás', last_name='Vera', email='tomas.vera@example.com')
+        grown = self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=updated['ETag'])
+        self.assertEqual(grown.status_code, 200)
+
+    def test_if_modified_since(self):
+        """If-Modified-Since posterior a la última modificación del cliente responde 304."""
+        url = f'/api/customers/{self.customer.id}/'
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_ignores_if_modified_since(self):
+        """
+        El listado no envía Last-Modified: eliminar un cliente no cambia MAX(last_updated)
+        y un 304 por fecha dejaría al cliente HTTP mostrando el eliminado.
+        """
+        other = Customer.objects.create(first_name='Tomás', last_name='Vera', email='tomas.vera@example.com')
+        response = self.client.get('/api/customers/')
+        self.assertNotIn('Last-Modified', response)
+
+        self.customer.delete()
+        response = self.client.get('/api/customers/', HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([customer['id'] for customer in response.data['results']], [other.id])
+
+    def test_missing_customer_still_returns_404(self):
+        """Un cliente inexistente mantiene la respuesta 404 habitual."""
+        self.assertEqual(self.client.get('/api/customers/999999/').status_code, 404)
+
+
+class CustomerSparseFieldsTest(APITestCase):
+    """
+    Pruebas de ?fields= / ?omit= en GET /api/customers/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Customer.objects.create(first_name='Elena', last_name='Soto', email='elena.soto@example.com', notes='Nota ' * 100)
+
+    def test_fields_on_list_and_detail(self):
+        response = self.client.get('/api/customers/?fields=id,email')
+        customer = response.data['results'][0]
+        self.assertEqual(set(customer), {'id', 'email'})
+
+        response = self.client.get(f"/api/customers/{customer['id']}/?omit=notes,address_line_1")
+        self.assertNotIn('notes', response.data)
+        self.assertEqual(response.data['first_name'], 'Elena')
+
+    def test_deferred_columns_keep_cursor_working(self):
+        """Las columnas del ordenamiento se cargan aunque no se pidan, sin queries extra por fila."""
+        for i in range(3):
+            Customer.objects.create(first_name=f'N{i}', last_name='Zúñiga', email=f'z{i}@example.com')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/customers/?fields=email&page_size=2')
+        self.assertIsNotNone(response.data['next'])
+        self.assertNotIn('"notes"', ctx.captured_queries[-1]['sql'])
+        # Validadores del GET condicional + página.
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+
+class CustomerFastListTest(APITestCase):
+    """
+    Prueba diferencial del camino rápido (API_FAST_LIST) en GET /api/customers/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Customer.objects.create(
+            first_name='Ana', last_name='Ríos', email='ana.rios@example.com',
+            date_of_birth=datetime.date(1990, 2, 28), city='Valdivia',
+        )
+        Customer.objects.create(first_name='Beto', last_name='Ríos', email='beto@example.com', is_active=False)
+
+    def _get(self, url, fast):
+        with self.settings(API_FAST_LIST=fast):
+            return self.client.get(url).content
+
+    def test_same_output_as_serializer(self):
+        for query in ['', '?fields=id,date_of_birth,date_joined', '?page_size=1']:
+            with self.subTest(query=query):
+                url = f'/api/customers/{query}'
+                self.assertEqual(self._get(url, fast=True), self._get(url, fast=False))
+
+    def test_respects_active_timezone(self):
+        """Las fechas se convierten a la zona horaria activa igual que DateTimeField."""
+        with self.settings(TIME_ZONE='America/Santiago'):
+            self.assertEqual(self._get('/api/customers/', fast=True), self._get('/api/customers/', fast=False))
+
+
+class CustomerAsyncViewTest(APITestCase):
+    """
+    GET /api/async/customers/ debe responder lo mismo que CustomerView.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, last_name in enumerate(['Ortiz', 'Araya', 'Ortiz', 'Bravo']):
+            Customer.objects.create(first_name=f'Nombre {i}', last_name=last_name, email=f'async{i}@example.com')
+
+    def test_list_and_detail_match_sync_view(self):
+        sync = self.client.get('/api/customers/?page_size=3').json()
+        async_ = self.client.get('/api/async/customers/?page_size=3').json()
+        self.assertEqual(async_['results'], sync['results'])
+        self.assertIn('/api/async/customers/', async_['next'])
+
+        customer_id = sync['results'][0]['id']
+        self.assertEqual(
+            self.client.get(f'/api/async/customers/{customer_id}/?omit=notes').json(),
+            self.client.get(f'/api/customers/{customer_id}/?omit=notes').json(),
+        )
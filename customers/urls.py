@@ -1,7 +1,7 @@
 # customers/urls.py
 from django.urls import path, include
 from rest_framework.routers import SimpleRouter
-from customers.views import CustomerView
+from customers.views import CustomerAsyncView, CustomerView
 from customers.schema_auth import DecoratedTokenObtainPairView
 
 router = SimpleRouter()
@@ -9,5 +9,7 @@ router.register(r"customers", CustomerView, basename="customers")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/customers/", CustomerAsyncView.as_view(), name="customers-async-list"),
+    path("async/customers/<str:pk>/", CustomerAsyncView.as_view(), name="customers-async-detail"),
     path("login/", DecoratedTokenObtainPairView.as_view(), name="token_obtain_pair"),
 ]
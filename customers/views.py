@@ -2,20 +2,27 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema_view, extend_schema
+from django_crud_api.async_views import AsyncReadOnlyView
+from django_crud_api.mixins import ConditionalGetMixin, FastListMixin, OptimizedQuerysetMixin
+from django_crud_api.serializers import DYNAMIC_FIELDS_PARAMETERS
+from orders.signals import defer_total_updates
 from .models import Customer
 from .serializers import CustomerSerializer
 
 @extend_schema_view(
-    list=extend_schema(summary="Listar clientes", description="Devuelve todos los clientes registrados.", tags=["Customers"]),
-    retrieve=extend_schema(summary="Obtener cliente", description="Muestra un cliente por ID.", tags=["Customers"]),
+    list=extend_schema(summary="Listar clientes", description="Devuelve todos los clientes registrados.", parameters=DYNAMIC_FIELDS_PARAMETERS, tags=["Customers"]),
+    retrieve=extend_schema(summary="Obtener cliente", description="Muestra un cliente por ID.", parameters=DYNAMIC_FIELDS_PARAMETERS, tags=["Customers"]),
     create=extend_schema(summary="Crear cliente", description="Registra un nuevo cliente. Requiere autenticación.", tags=["Customers"]),
     update=extend_schema(summary="Actualizar cliente", description="Reemplaza todos los datos. Requiere permisos de administrador.", tags=["Customers"]),
     partial_update=extend_schema(summary="Actualización parcial", description="Modifica algunos campos. Requiere permisos de administrador.", tags=["Customers"]),
     destroy=extend_schema(summary="Eliminar cliente", description="Solo si no tiene pedidos pendientes. Requiere permisos de administrador.", tags=["Customers"]),
 )
-class CustomerView(viewsets.ModelViewSet):
+class CustomerView(ConditionalGetMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    last_modified_field = 'last_updated'
+    # Orden estable para la paginación por cursor (coincide con Customer.Meta.ordering)
+    ordering = ('last_name', 'first_name', 'id')
 
     def get_permissions(self):
         action_perm_map = {
@@ -36,4 +43,13 @@ class CustomerView(viewsets.ModelViewSet):
         has_pending_orders = instance.orders.filter(status='pending').exists()
         if has_pending_orders:
             raise ValidationError({"detail": "No se puede eliminar un cliente con pedidos pendientes."})
-        instance.delete()
+        # Sus órdenes se eliminan en cascada: los items borrados no recalculan sus totales.
+        with defer_total_updates():
+            instance.delete()
+
+
+class CustomerAsyncView(AsyncReadOnlyView):
+    """GET /api/async/customers/ y /api/async/customers/<id>/: lectura pública de clientes con el ORM async."""
+    queryset = Customer.objects.all()
+    serializer_class = CustomerSerializer
+    ordering = CustomerView.ordering
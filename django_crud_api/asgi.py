@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_crud_api.settings')
 
 application = get_asgi_application()
+
+# El esquema OpenAPI se genera al arrancar, no en la primera petición a /api/schema/.
+from django_crud_api.schema import PrecomputedSpectacularAPIView  # noqa: E402
+
+PrecomputedSpectacularAPIView.warm_up()
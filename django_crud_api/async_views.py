@@ -0,0 +1,63 @@
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .mixins import get_ordering_columns
+from .renderers import FastJSONRenderer
+
+
+class AsyncReadOnlyView(View):
+    """
+    Listado y detalle nativos de ASGI: las consultas usan el ORM async (aiterator,
+    aget), así bajo uvicorn una petición esperando a la base de datos no ocupa un
+    hilo del pool de vistas síncronas.
+
+    La respuesta es la misma que la de list/retrieve del ViewSet equivalente:
+    mismo serializador (con ?fields=/?omit=), misma paginación por cursor y mismo
+    formato de errores. No incluye la caché del catálogo ni el GET condicional.
+    """
+    queryset = None
+    serializer_class = None
+    ordering = ('id',)
+    renderer_class = FastJSONRenderer
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, pk=None):
+        request = Request(request)
+        try:
+            data = await (self.list(request) if pk is None else self.retrieve(request, pk))
+            status = 200
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            status = exc.status_code
+        return HttpResponse(self.renderer_class().render(data), status=status, content_type='application/json')
+
+    def get_serializer(self, request, *args, **kwargs):
+        return self.serializer_class(*args, context={'request': request, 'view': self}, **kwargs)
+
+    def get_queryset(self, request):
+        serializer = self.get_serializer(request)
+        return serializer.optimize_queryset(self.queryset.all(), extra_columns=get_ordering_columns(self))
+
+    async def list(self, request):
+        queryset = self.get_queryset(request)
+        pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+        if pagination_class is None:
+            page = [item async for item in queryset.order_by(*self.ordering).aiterator()]
+            return self.get_serializer(request, page, many=True).data
+
+        paginator = pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(request, page, many=True).data).data
+
+    async def retrieve(self, request, pk):
+        queryset = self.get_queryset(request)
+        try:
+            instance = await queryset.aget(pk=pk)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            # Mismo mensaje que get_object_or_404 en los ViewSets.
+            raise NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+        return self.get_serializer(request, instance).data
@@ -0,0 +1,140 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class LRUCache:
+    """
+    Caché en memoria del proceso, acotada a `maxsize` entradas (se descarta la
+    usada hace más tiempo) y con vencimiento por entrada (timestamp absoluto).
+    Es segura entre hilos.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Usuarios resueltos por id (el claim USER_ID_CLAIM del token).
+user_cache = LRUCache(settings.AUTH_USER_CACHE_SIZE)
+
+# Tokens ya verificados, por sha256 del token crudo; cada uno vence en su claim 'exp'.
+token_cache = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Descarta el usuario de la caché al guardarlo (desactivación, cambio de contraseña) o borrarlo."""
+    user_cache.delete(str(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+post_save.connect(invalidate_cached_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='auth_user_cache_save')
+post_delete.connect(invalidate_cached_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='auth_user_cache_delete')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sin la query a auth_user en cada petición.
+
+    El usuario se guarda en una caché LRU local al proceso durante
+    AUTH_USER_CACHE_TIMEOUT segundos. Guardar o borrar el usuario lo invalida en
+    el proceso que hizo el cambio; los demás procesos lo ven al vencer el TTL, por
+    eso debe ser corto. Las escrituras con update() no disparan señales y también
+    dependen del TTL. Las comprobaciones de usuario activo y de revocación por
+    cambio de contraseña se repiten sobre el usuario cacheado.
+
+    Con AUTH_STATELESS_USERS no se consulta la base de datos: el usuario se arma
+    con los claims del token (TokenUser, con is_staff y username). Un usuario
+    desactivado conserva el acceso hasta que vence su access token.
+
+    Los tokens verificados también se cachean (AUTH_TOKEN_CACHE_SIZE, 0 para
+    desactivar), así un mismo access token no se decodifica ni se verifica su
+    firma en cada petición. La entrada vence en el 'exp' del token, por lo que un
+    token vencido nunca se acepta desde la caché. Si se instala la lista negra de
+    simplejwt, un token cacheado no vuelve a consultarla.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.sha256(raw_token).hexdigest()
+        validated_token = token_cache.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            expires_at = validated_token.get('exp')
+            if expires_at is not None:
+                token_cache.set(key, validated_token, expires_at)
+        return validated_token
+
+    def get_user(self, validated_token):
+        if settings.AUTH_STATELESS_USERS:
+            return self.get_token_user(validated_token)
+
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # La clase base consulta la base de datos y valida el usuario.
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user, time.time() + settings.AUTH_USER_CACHE_TIMEOUT)
+        else:
+            self.check_user(user, validated_token)
+        # Copia por petición: la instancia cacheada se comparte entre hilos.
+        return copy.copy(user)
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    def check_user(self, user, validated_token):
+        """Mismas validaciones que JWTAuthentication.get_user tras leer el usuario."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
@@ -0,0 +1,49 @@
+import contextlib
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE = 'default'
+
+# Réplica asignada a la petición en curso; None = todo va al primario. Es una
+# ContextVar para que cada petición (hilo o tarea async) tenga su propio valor.
+_read_database = ContextVar('read_database', default=None)
+
+
+@contextlib.contextmanager
+def read_from(alias):
+    """Dirige las lecturas del bloque a `alias` (None para el primario)."""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def use_primary():
+    """Fuerza lecturas y escrituras del bloque al primario."""
+    return read_from(None)
+
+
+class ReplicaRouter:
+    """
+    Envía las lecturas a la réplica elegida para la petición (ver
+    ReplicaRoutingMiddleware) y todas las escrituras al primario. Fuera de una
+    petición de lectura (comandos, señales, escrituras, tests) todo va al primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DATABASE, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación.
+        return db == PRIMARY_DATABASE
@@ -0,0 +1,204 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# nombre: (tipo, descripción, buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Peticiones atendidas por ruta, acción y código de estado.', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Latencia de la petición (en streaming, hasta entregar la respuesta).', LATENCY_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Queries ejecutadas por petición.', QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Tiempo en la base de datos por petición.', LATENCY_BUCKETS),
+    'http_response_size_bytes': (
+        'histogram', 'Tamaño del cuerpo de la respuesta (sin las respuestas en streaming).', SIZE_BUCKETS),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _ThreadStore:
+    """Valores de un hilo. Solo los modifica su hilo, por eso no necesita lock."""
+
+    def __init__(self):
+        self.counters = {}
+        # (nombre, labels) -> [cantidad por bucket..., cantidad en +Inf, suma]
+        self.histograms = {}
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas en memoria del proceso.
+
+    Cada hilo escribe en su propio _ThreadStore, así registrar una petición no
+    toma ningún lock. Al exportar se suman los stores de todos los hilos.
+
+    Con METRICS_MULTIPROC_DIR, cada proceso guarda además su snapshot en ese
+    directorio (metrics_<pid>.json, cada METRICS_FLUSH_INTERVAL segundos y al
+    salir). /metrics suma los archivos de todos los workers, así cualquier worker
+    que atienda el scrape devuelve los totales del servidor. Los archivos de
+    procesos terminados se conservan para que los contadores no retrocedan; el
+    directorio se vacía al reiniciar el despliegue.
+    """
+
+    def __init__(self):
+        self._stores = []
+        self._local = threading.local()
+        self._flush_lock = threading.Lock()
+        self._next_flush = 0.0
+
+    def _get_store(self):
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            store = self._local.store = _ThreadStore()
+            # list.append es atómico: no hace falta lock para registrar el hilo.
+            self._stores.append(store)
+        return store
+
+    def inc(self, name, labels, amount=1):
+        counters = self._get_store().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        histograms = self._get_store().histograms
+        key = (name, labels)
+        data = histograms.get(key)
+        if data is None:
+            data = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        data[bisect.bisect_left(buckets, value)] += 1
+        data[-1] += value
+
+    def snapshot(self):
+        """Totales del proceso: {'counters': {clave: valor}, 'histograms': {clave: datos}}."""
+        counters, histograms = {}, {}
+        for store in list(self._stores):
+            _merge(counters, histograms, list(store.counters.items()), list(store.histograms.items()))
+        return {'counters': counters, 'histograms': histograms}
+
+    def collect(self):
+        """Snapshot del proceso más los de los demás workers, si hay directorio multiproceso."""
+        snapshot = self.snapshot()
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return snapshot
+
+        self.flush(snapshot)
+        counters, histograms = {}, {}
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            try:
+                with open(path, encoding='utf-8') as snapshot_file:
+                    data = json.load(snapshot_file)
+            except (OSError, ValueError):
+                # Archivo de un worker que se está escribiendo o ya no existe.
+                continue
+            _merge(
+                counters, histograms,
+                [((name, _labels(labels)), value) for name, labels, value in data['counters']],
+                [((name, _labels(labels)), value) for name, labels, value in data['histograms']],
+            )
+        return {'counters': counters, 'histograms': histograms}
+
+    def maybe_flush(self):
+        if not settings.METRICS_MULTIPROC_DIR or time.monotonic() < self._next_flush:
+            return
+        # Un solo hilo escribe; si otro ya lo está haciendo, se omite.
+        if self._flush_lock.acquire(blocking=False):
+            try:
+                self._next_flush = time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+                self.flush()
+            finally:
+                self._flush_lock.release()
+
+    def flush(self, snapshot=None):
+        """Guarda el snapshot del proceso en METRICS_MULTIPROC_DIR (reemplazo atómico)."""
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return
+        snapshot = snapshot or self.snapshot()
+        data = {
+            'counters': [[name, list(labels), value] for (name, labels), value in snapshot['counters'].items()],
+            'histograms': [[name, list(labels), value] for (name, labels), value in snapshot['histograms'].items()],
+        }
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics_', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            json.dump(data, tmp_file)
+        os.replace(tmp_path, os.path.join(directory, f'metrics_{os.getpid()}.json'))
+
+    def clear(self):
+        for store in list(self._stores):
+            store.counters.clear()
+            store.histograms.clear()
+
+
+def _labels(pairs):
+    return tuple(tuple(pair) for pair in pairs)
+
+
+def _merge(counters, histograms, counter_items, histogram_items):
+    for key, value in counter_items:
+        counters[key] = counters.get(key, 0) + value
+    for key, data in histogram_items:
+        total = histograms.get(key)
+        histograms[key] = list(data) if total is None else [a + b for a, b in zip(total, data)]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(snapshot):
+    """Formato de texto de Prometheus (0.0.4)."""
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        source = snapshot['histograms'] if kind == 'histogram' else snapshot['counters']
+        series = sorted((labels, value) for (metric, labels), value in source.items() if metric == name)
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+def metrics_view(request):
+    """Métricas de la API en formato Prometheus (para el scrape, no es parte de la API REST)."""
+    return HttpResponse(render(registry.collect()), content_type=CONTENT_TYPE)
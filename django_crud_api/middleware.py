@@ -0,0 +1,273 @@
+import contextlib
+import contextvars
+import functools
+import hashlib
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_routers import read_from
+from .metrics import registry
+from .profiling import QueryRecorder, StackSamples, sampler, write_profile
+
+
+@sync_and_async_middleware
+class ReplicaRoutingMiddleware:
+    """
+    Asigna una réplica de lectura (settings.DATABASE_REPLICAS) a cada petición
+    GET/HEAD/OPTIONS. Las demás peticiones usan solo el primario.
+
+    Después de una escritura exitosa, el cliente queda fijado al primario durante
+    DB_PRIMARY_STICKY_SECONDS, para que lea sus propios cambios aunque las réplicas
+    tengan retraso. El cliente se identifica por el hash del header Authorization
+    (o de la cookie de sesión) y la marca se guarda en la caché por defecto. Solo
+    vale para todos los procesos si esa caché es compartida (CACHE_URL con Redis o
+    Memcached); con la locmem por defecto cada proceso tiene sus propias marcas y
+    otro worker puede atender la lectura siguiente desde una réplica.
+
+    Funciona también bajo ASGI sin ocupar un hilo: la réplica elegida se guarda en
+    una ContextVar (ver db_routers), que las vistas async heredan.
+    """
+    pin_key_prefix = 'db:primary-pin:'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return self.get_response(request)
+
+        client_key = self.get_client_key(request)
+        pinned = client_key is not None and cache.get(self.pin_key_prefix + client_key) is not None
+        with read_from(self.choose_replica(request, replicas, pinned)):
+            response = self.get_response(request)
+
+        if self.should_pin(request, response, client_key):
+            cache.set(self.pin_key_prefix + client_key, True, settings.DB_PRIMARY_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return await self.get_response(request)
+
+        client_key = self.get_client_key(request)
+        pinned = client_key is not None and await cache.aget(self.pin_key_prefix + client_key) is not None
+        with read_from(self.choose_replica(request, replicas, pinned)):
+            response = await self.get_response(request)
+
+        if self.should_pin(request, response, client_key):
+            await cache.aset(self.pin_key_prefix + client_key, True, settings.DB_PRIMARY_STICKY_SECONDS)
+        return response
+
+    def choose_replica(self, request, replicas, pinned):
+        """Réplica para la petición, o None para leer del primario."""
+        if request.method in SAFE_METHODS and not pinned:
+            return random.choice(replicas)
+        return None
+
+    def should_pin(self, request, response, client_key):
+        return request.method not in SAFE_METHODS and response.status_code < 400 and client_key is not None
+
+    def get_client_key(self, request):
+        credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not credential:
+            return None
+        return hashlib.sha256(credential.encode()).hexdigest()
+
+
+
+def get_route(request):
+    """(nombre de la URL, acción del viewset) de la petición; ('unmatched', '') si no resolvió."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched', ''
+    # Viewsets de DRF: as_view({'get': 'list', ...}) deja el mapeo en func.actions.
+    actions = getattr(match.func, 'actions', None) or {}
+    return match.view_name or match.route, actions.get(request.method.lower(), '')
+
+
+# Wrappers activos en el contexto actual. Una ContextVar, y no la lista execute_wrappers
+# de cada conexión, porque las conexiones son por hilo y el ORM async ejecuta sus
+# queries en un hilo de sync_to_async, que recibe una copia de este contexto.
+_active_wrappers = contextvars.ContextVar('active_execute_wrappers', default=())
+
+
+def _run_active_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(_active_wrappers.get()):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_wrapper_dispatch(connection, **kwargs):
+    """Agrega _run_active_wrappers a la conexión (una vez); se llama al abrir cada conexión."""
+    if _run_active_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _run_active_wrappers)
+
+
+connection_created.connect(install_wrapper_dispatch)
+
+
+@contextlib.contextmanager
+def execute_wrapper_all(wrapper):
+    """
+    Aplica `wrapper` (firma de connection.execute_wrapper) a las queries de todas las
+    bases de datos ejecutadas dentro del bloque, también desde los hilos de sync_to_async.
+    """
+    for connection in connections.all(initialized_only=True):
+        install_wrapper_dispatch(connection)
+    token = _active_wrappers.set((*_active_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        _active_wrappers.reset(token)
+
+
+class QueryCounter:
+    """execute_wrapper que cuenta las queries y acumula su tiempo."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+@sync_and_async_middleware
+class MetricsMiddleware:
+    """
+    Registra por ruta (nombre de la URL) y acción del viewset: latencia, queries y
+    tiempo en la base de datos, tamaño de la respuesta y código de estado. Los
+    valores se exponen en /metrics (ver django_crud_api.metrics).
+
+    Las peticiones que no resuelven ninguna URL se agrupan en view="unmatched"
+    para que rutas arbitrarias no creen series nuevas.
+
+    Bajo ASGI el middleware es async: las conexiones son las mismas que usa el ORM
+    async desde su hilo, así que el contador también ve esas queries.
+    """
+    methods = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with execute_wrapper_all(queries):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with execute_wrapper_all(queries):
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        labels = self.get_labels(request)
+        registry.inc('http_requests_total', (*labels, ('status', str(response.status_code))))
+        registry.observe('http_request_duration_seconds', labels, duration)
+        registry.observe('http_request_db_queries', labels, queries.count)
+        registry.observe('http_request_db_duration_seconds', labels, queries.duration)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content))
+        registry.maybe_flush()
+
+    def get_labels(self, request):
+        method = request.method if request.method in self.methods else 'other'
+        view, action = get_route(request)
+        return (('view', view), ('action', action), ('method', method))
+
+
+@sync_and_async_middleware
+class ProfilingMiddleware:
+    """
+    Modo de diagnóstico, activo solo con PROFILE_REQUESTS=True.
+
+    Cada petición registra la línea de tiempo de sus queries (QueryRecorder) y
+    muestras de su stack (Sampler). Si tarda PROFILE_SLOW_REQUEST_MS o más, se
+    escribe en PROFILE_LOG_FILE un registro 'slow_request' con las queries, las
+    queries repetidas agrupadas por fingerprint (N+1) y las funciones donde más
+    muestras cayeron. Las queries lentas se registran aparte con su EXPLAIN.
+
+    Bajo ASGI no se muestrea el stack: el hilo del event loop atiende varias
+    peticiones a la vez y las muestras no se podrían atribuir a una de ellas.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_REQUESTS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(request.path)
+        thread_id = threading.get_ident()
+        samples = sampler.start(thread_id)
+        try:
+            with execute_wrapper_all(recorder):
+                response = self.get_response(request)
+        finally:
+            sampler.stop(thread_id)
+        self.record(request, response, recorder, samples)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(request.path)
+        with execute_wrapper_all(recorder):
+            response = await self.get_response(request)
+        self.record(request, response, recorder, StackSamples())
+        return response
+
+    def record(self, request, response, recorder, samples):
+        duration_ms = (time.perf_counter() - recorder.start) * 1000
+        if duration_ms < settings.PROFILE_SLOW_REQUEST_MS:
+            return
+        view, action = get_route(request)
+        write_profile({
+            'type': 'slow_request',
+            'timestamp': timezone.now(),
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'action': action,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'db_duration_ms': round(sum(entry['duration_ms'] for entry in recorder.queries), 3),
+            'queries': recorder.queries,
+            'duplicates': recorder.duplicates(),
+            'samples': samples.count,
+            'hot_spots': samples.hot_spots(),
+        })
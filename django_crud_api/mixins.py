@@ -0,0 +1,149 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .db_routers import use_primary
+from .serializers import ValuesSerializer
+
+
+class PrimaryDatabaseWritesMixin:
+    """
+    Ejecuta create, update/partial_update y destroy contra el primario, incluidas
+    las lecturas de validación, aunque la petición tenga asignada una réplica.
+    """
+
+    def create(self, request, *args, **kwargs):
+        with use_primary():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with use_primary():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with use_primary():
+            return super().destroy(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) para las acciones list y retrieve.
+
+    Los validadores se calculan desde la columna de última modificación del modelo,
+    sin serializar nada: MAX(columna) y COUNT(*) para listados, y el valor de la
+    columna para el detalle. Si el cliente ya tiene la versión vigente
+    (If-None-Match / If-Modified-Since) se responde 304 sin cuerpo.
+
+    Los listados solo usan ETag: eliminar una fila no cambia MAX(columna), así que
+    con Last-Modified un cliente podría recibir 304 y seguir mostrando la fila
+    eliminada. El ETag incluye la cantidad de filas y sí cambia.
+    """
+    last_modified_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_list_validators, super().list, request, *args, with_last_modified=False, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self.get_detail_validators, super().retrieve, request, *args, **kwargs)
+
+    def get_list_validators(self, request):
+        """Devuelve (última modificación, cantidad) del listado filtrado con una sola query."""
+        summary = self.filter_queryset(self.get_queryset()).aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count('pk'),
+        )
+        return summary['last_modified'], summary['count']
+
+    def get_detail_validators(self, request):
+        """Devuelve (última modificación, 1) del objeto, o None si no existe."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            last_modified = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**lookup)
+                .values_list(self.last_modified_field, flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return None if last_modified is None else (last_modified, 1)
+
+    def conditional_response(self, get_validators, handler, request, *args, with_last_modified=True, **kwargs):
+        validators = get_validators(request)
+        if validators is None:
+            # Objeto inexistente o lookup inválido: la vista responde el error habitual.
+            return handler(request, *args, **kwargs)
+
+        last_modified, count = validators
+        etag = self.get_etag(request, last_modified, count)
+        timestamp = int(last_modified.timestamp()) if last_modified and with_last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def get_etag(self, request, last_modified, count):
+        # La URL y el media type aceptado distinguen páginas, filtros y formatos.
+        seed = '|'.join([
+            request.get_full_path(),
+            request.accepted_media_type or '',
+            last_modified.isoformat() if last_modified else '',
+            str(count),
+        ])
+        return quote_etag(hashlib.md5(seed.encode(), usedforsecurity=False).hexdigest())
+
+
+class OptimizedQuerysetMixin:
+    """
+    Ajusta get_queryset a lo que el serializador va a renderizar (ver
+    DynamicFieldsMixin.optimize_queryset). Las columnas de `ordering` se cargan
+    siempre porque la paginación las usa para construir el cursor.
+
+    Solo se aplica en `optimized_actions`, las acciones que renderizan lo que leen;
+    las escrituras cargan por su cuenta lo que necesitan y no pagan precargas.
+    """
+    optimized_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.optimized_actions:
+            return queryset
+        return self.get_serializer().optimize_queryset(queryset, extra_columns=get_ordering_columns(self))
+
+
+class FastListMixin:
+    """
+    Camino rápido para la acción list, activado con settings.API_FAST_LIST: el
+    listado se lee con values() y se serializa con ValuesSerializer, con la misma
+    salida que el serializador. Si el serializador no se puede compilar se usa
+    el camino normal.
+    """
+
+    def list(self, request, *args, **kwargs):
+        compiled = ValuesSerializer.compile(self.get_serializer()) if settings.API_FAST_LIST else None
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        # Las columnas del ordenamiento se incluyen para que la paginación arme el cursor.
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()), extra_keys=get_ordering_columns(self))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.render(page))
+        return Response(compiled.render(queryset))
+
+
+def get_ordering_columns(view):
+    return [field.lstrip('-') for field in getattr(view, 'ordering', None) or ()]
@@ -0,0 +1,185 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder recorta las fechas y horas a milisegundos; en un cursor eso
+    saltaría las filas entre el valor recortado y el real. Aquí se conservan los
+    microsegundos, y el filtro del keyset vuelve a leerlas como el mismo valor.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) para los endpoints de listado.
+
+    El cursor guarda los valores de ordenamiento del último elemento entregado y la
+    página siguiente se obtiene con un WHERE sobre esas columnas, sin OFFSET: cada
+    página cuesta O(page_size) sin importar su profundidad, siempre que exista un
+    índice sobre el ordenamiento.
+
+    El ordenamiento se toma del atributo `ordering` de la vista. Debe terminar en un
+    campo único (normalmente 'id') y sus columnas no pueden ser nulas.
+    """
+    cursor_query_param = 'cursor'
+    cursor_query_description = 'Cursor de paginación devuelto en "next" o "previous".'
+    page_size_query_param = 'page_size'
+    page_size_query_description = 'Cantidad de resultados por página.'
+    invalid_cursor_message = 'Cursor inválido.'
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.build_page(list(queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Versión async de paginate_queryset para vistas ASGI (lee la página con aiterator)."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.build_page([item async for item in queryset[:self.page_size + 1].aiterator()])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Prepara el queryset filtrado y ordenado de la página, sin evaluarlo."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.cursor, self.reverse = self.decode_cursor(request)
+
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(self._keyset_filter(self.cursor, self.reverse))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        order_by = [_flip(field) for field in self.ordering] if self.reverse else self.ordering
+        return queryset.order_by(*order_by)
+
+    def build_page(self, results):
+        """Recorta los resultados (page_size + 1) y calcula si hay páginas vecinas."""
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            # Al retroceder los resultados llegan invertidos; siempre hay página
+            # siguiente porque el cursor apunta a un elemento ya entregado.
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.cursor_query_description,
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.page_size_query_description,
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested > 0:
+            page_size = requested
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, 'ordering', None) or self.ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        values = [_get_value(item, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, cls=CursorEncoder)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _keyset_filter(self, values, reverse):
+        """
+        Construye la comparación lexicográfica sobre las columnas de ordenamiento:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition, equal = Q(), Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+
+def _get_value(item, name):
+    # Los listados del camino rápido (ValuesSerializer) paginan dicts de values().
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
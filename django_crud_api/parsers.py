@@ -0,0 +1,27 @@
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser que decodifica con orjson cuando está instalado y el cuerpo viene en
+    UTF-8. Ante cualquier error se reintenta con el parser estándar, que es el que
+    arma el mensaje de ParseError habitual.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(content), media_type, parser_context)
@@ -0,0 +1,184 @@
+import logging
+import logging.handlers
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .renderers import dumps
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r'(?<![\w"`.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+_VALUES_ROWS = re.compile(r'(\(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Forma normalizada de una query: literales y parámetros como ?, listas IN y
+    filas de VALUES colapsadas. Dos queries con el mismo fingerprint solo difieren
+    en sus valores, que es lo que delata un N+1.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _VALUES_ROWS.sub(r'\1, ...', sql)
+
+
+_log_handlers = {}
+_log_handlers_lock = threading.Lock()
+
+
+def write_profile(record):
+    """Agrega `record` como una línea JSON a PROFILE_LOG_FILE (con rotación por tamaño)."""
+    path = settings.PROFILE_LOG_FILE
+    handler = _log_handlers.get(path)
+    if handler is None:
+        with _log_handlers_lock:
+            handler = _log_handlers.get(path)
+            if handler is None:
+                handler = _log_handlers[path] = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=settings.PROFILE_LOG_MAX_BYTES,
+                    backupCount=settings.PROFILE_LOG_BACKUP_COUNT, encoding='utf-8', delay=True,
+                )
+    handler.handle(logging.makeLogRecord({'msg': dumps(record).decode()}))
+
+
+class QueryRecorder:
+    """
+    execute_wrapper que guarda la línea de tiempo de las queries de una petición
+    (inicio relativo, duración, SQL sin parámetros). Una SELECT que supera
+    PROFILE_SLOW_QUERY_MS se repite con el prefijo EXPLAIN del motor y se registra
+    en el log como 'slow_query'. Los valores de los parámetros no se guardan.
+    """
+
+    def __init__(self, path=''):
+        self.path = path
+        self.start = time.perf_counter()
+        self.queries = []
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            connection = context['connection']
+            entry = {
+                'offset_ms': round((start - self.start) * 1000, 3),
+                'duration_ms': round(duration_ms, 3),
+                'alias': connection.alias,
+                'sql': sql,
+            }
+            if duration_ms >= settings.PROFILE_SLOW_QUERY_MS and not many and sql.lstrip()[:6].upper() == 'SELECT':
+                entry['explain'] = self.explain(connection, sql, params)
+                write_profile({'type': 'slow_query', 'timestamp': timezone.now(), 'path': self.path, **entry})
+            self.queries.append(entry)
+
+    def explain(self, connection, sql, params):
+        self._explaining = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return [[str(value) for value in row] for row in cursor.fetchall()]
+        except DatabaseError as exc:
+            return f'EXPLAIN falló: {exc}'
+        finally:
+            self._explaining = False
+
+    def duplicates(self):
+        """Fingerprints ejecutados más de una vez, del más repetido al menos."""
+        groups = {}
+        for entry in self.queries:
+            group = groups.setdefault(fingerprint(entry['sql']), {'count': 0, 'duration_ms': 0.0})
+            group['count'] += 1
+            group['duration_ms'] += entry['duration_ms']
+        return [
+            {'fingerprint': sql, 'count': group['count'], 'duration_ms': round(group['duration_ms'], 3)}
+            for sql, group in sorted(groups.items(), key=lambda item: -item[1]['count'])
+            if group['count'] > 1
+        ]
+
+
+class StackSamples:
+    """Muestras del stack de un hilo: veces que cada función estaba en ejecución (self) o en el stack (total)."""
+
+    def __init__(self):
+        self.count = 0
+        self.own = {}
+        self.total = {}
+
+    def add(self, frame):
+        self.count += 1
+        code = frame.f_code
+        key = (code.co_filename, code.co_firstlineno, code.co_name)
+        self.own[key] = self.own.get(key, 0) + 1
+        seen = set()
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            if key not in seen:
+                seen.add(key)
+                self.total[key] = self.total.get(key, 0) + 1
+            frame = frame.f_back
+
+    def hot_spots(self, limit=20):
+        ranked = sorted(self.total, key=lambda key: (-self.own.get(key, 0), -self.total[key]))[:limit]
+        return [
+            {
+                'function': name, 'file': filename, 'line': line,
+                'self': self.own.get((filename, line, name), 0), 'total': self.total[(filename, line, name)],
+            }
+            for filename, line, name in ranked
+        ]
+
+
+class Sampler:
+    """
+    Profiler por muestreo: un único hilo daemon que cada PROFILE_SAMPLE_INTERVAL_MS lee
+    el stack de los hilos registrados con start() (sys._current_frames()). No
+    instrumenta las llamadas, así el costo no depende de cuánto código se ejecute.
+    """
+
+    def __init__(self):
+        self._targets = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, thread_id):
+        samples = self._targets[thread_id] = StackSamples()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+                    self._thread.start()
+        return samples
+
+    def stop(self, thread_id):
+        return self._targets.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            if not self._targets:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in list(self._targets.items()):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples.add(frame)
+
+
+sampler = Sampler()
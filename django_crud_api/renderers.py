@@ -0,0 +1,63 @@
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json de la stdlib.
+    orjson = None
+
+# Fechas y horas pasan al encoder de DRF para conservar su formato (milisegundos y 'Z').
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+
+_encoder_default = encoders.JSONEncoder().default
+
+
+def _escape_line_separators(content):
+    # Igual que JSONRenderer: U+2028/U+2029 escapados para que la salida sea JavaScript válido.
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def dumps(data):
+    """
+    Serializa `data` a bytes JSON compactos como FastJSONRenderer (con sus mismas
+    diferencias en floats). Pensado para respuestas en streaming, que no pasan por
+    los renderers de DRF.
+    """
+    if orjson is not None:
+        try:
+            return _escape_line_separators(orjson.dumps(data, default=_encoder_default, option=ORJSON_OPTIONS))
+        except orjson.JSONEncodeError:
+            pass
+    return renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson cuando está instalado.
+
+    Los tipos que orjson no maneja de forma nativa (Decimal, fechas, lazy strings,
+    querysets) se delegan al encoder de DRF, así la salida es la misma que la del
+    renderer estándar. Se usa el renderer estándar cuando se pide indentación
+    (API navegable, ?indent=), cuando la configuración no es la de por defecto
+    (UNICODE_JSON / COMPACT_JSON) o si orjson rechaza el dato (ej. enteros de más
+    de 64 bits).
+
+    Los floats son la excepción: orjson los escribe con el mismo valor pero no
+    siempre con el mismo texto que json (1e-5 y 1e16 en lugar de 1e-05 y 1e+16), y
+    escribe NaN/Infinity como null en lugar de rechazarlos como STRICT_JSON. En esta
+    API solo la relevancia de /api/products/search/ es float; los importes son
+    Decimal y se serializan como string.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        default = _encoder_default if self.encoder_class is encoders.JSONEncoder else self.encoder_class().default
+        try:
+            content = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return _escape_line_separators(content)
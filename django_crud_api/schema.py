@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import threading
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.views import SpectacularAPIView
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documenta CachedJWTAuthentication igual que el JWTAuthentication de simplejwt."""
+    target_class = 'django_crud_api.authentication.CachedJWTAuthentication'
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Si el valor de Accept-Encoding admite gzip: 'gzip' (o 'x-gzip') con q > 0 o,
+    si no aparece, '*' con q > 0. 'gzip;q=0' lo rechaza.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+class PrecomputedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView que introspecciona las vistas una sola vez por proceso.
+
+    warm_up() genera el esquema (o lo lee de API_SCHEMA_FILE, el schema.yml
+    generado con `manage.py spectacular`) y renderiza cada formato al arrancar el
+    proceso (wsgi.py / asgi.py), junto con su versión gzip y su ETag. Las
+    peticiones solo eligen la variante y responden 304 si el cliente ya la tiene;
+    una variante que no se precalculó (otra versión o idioma) se genera en su
+    primera petición.
+    """
+    _schemas = {}
+    _documents = {}
+    _lock = threading.Lock()
+
+    def _get_schema_response(self, request):
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        renderer = request.accepted_renderer
+        key = (version, translation.get_language(), renderer.media_type)
+
+        document = self._documents.get(key)
+        if document is None:
+            with self._lock:
+                document = self._documents.get(key)
+                if document is None:
+                    document = self._documents[key] = self.build_document(request, version, renderer)
+
+        use_gzip = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        content, etag = document['gzip'] if use_gzip else document['identity']
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=document['content_type'])
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, version)}"'
+            if use_gzip:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept', 'Accept-Encoding'])
+        return response
+
+    def get_schema(self, request, version):
+        key = (version, translation.get_language())
+        if key not in self._schemas:
+            if settings.API_SCHEMA_FILE:
+                with open(settings.API_SCHEMA_FILE, encoding='utf-8') as schema_file:
+                    self._schemas[key] = yaml.safe_load(schema_file)
+            else:
+                generator = self.generator_class(urlconf=self.urlconf, api_version=version, patterns=self.patterns)
+                self._schemas[key] = generator.get_schema(request=request, public=self.serve_public)
+        return self._schemas[key]
+
+    def build_document(self, request, version, renderer):
+        content = renderer.render(self.get_schema(request, version), renderer_context={'request': request})
+        digest = hashlib.sha256(content).hexdigest()
+        return {
+            'content_type': f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type,
+            'identity': (content, quote_etag(digest)),
+            # mtime=0 para que el gzip (y su ETag) no cambie entre procesos.
+            'gzip': (gzip.compress(content, mtime=0), quote_etag(f'{digest}-gzip')),
+        }
+
+    @classmethod
+    def warm_up(cls):
+        """Genera y renderiza el esquema en todos los formatos, para la versión e idioma por defecto."""
+        view = cls()
+        with translation.override(settings.LANGUAGE_CODE):
+            for renderer_class in view.renderer_classes:
+                renderer = renderer_class()
+                key = (view.api_version, translation.get_language(), renderer.media_type)
+                with cls._lock:
+                    if key not in cls._documents:
+                        cls._documents[key] = view.build_document(None, view.api_version, renderer)
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._schemas.clear()
+            cls._documents.clear()
@@ -0,0 +1,302 @@
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import relations, serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import ISO_8601, api_settings
+
+# Parámetros documentados en los endpoints de lectura que usan DynamicFieldsMixin.
+DYNAMIC_FIELDS_PARAMETERS = [
+    OpenApiParameter('fields', str, description="Campos a incluir, separados por coma. Admite rutas anidadas (ej. items.quantity)."),
+    OpenApiParameter('omit', str, description="Campos a excluir, separados por coma. Admite rutas anidadas."),
+    OpenApiParameter('expand', str, description="Relaciones a expandir como objeto completo (ej. items.product)."),
+]
+
+
+def _split_param(request, name):
+    query_params = getattr(request, 'query_params', request.GET)
+    return [path.strip() for path in query_params.get(name, '').split(',') if path.strip()]
+
+
+class DynamicFieldsMixin:
+    """
+    Selección dinámica de campos para ModelSerializer mediante ?fields=, ?omit= y ?expand=.
+
+    Las rutas son relativas a la raíz de la respuesta y usan punto para los niveles
+    anidados: ?fields=id,items.quantity&expand=items.product. Cada serializador
+    anidado calcula su propia ruta desde sus padres, así que la misma clase sirve
+    en la raíz o anidada. Los parámetros solo se aplican en métodos de lectura.
+
+    `Meta.expandable_fields` ({campo: clase de serializador}) declara las relaciones
+    que por defecto se devuelven como id y que ?expand= reemplaza por el objeto.
+    """
+
+    @property
+    def field_path(self):
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(names))
+
+    @property
+    def is_dynamic(self):
+        request = self.context.get('request')
+        return request is not None and request.method in SAFE_METHODS
+
+    def get_requested(self, name):
+        """Nombres del parámetro `name` que corresponden a este nivel (primer segmento relativo)."""
+        if not self.is_dynamic:
+            return []
+        prefix = f'{self.field_path}.' if self.field_path else ''
+        return [path[len(prefix):] for path in _split_param(self.context['request'], name) if path.startswith(prefix)]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_dynamic:
+            return fields
+
+        for name in {path.split('.')[0] for path in self.get_requested('expand')}:
+            serializer_class = getattr(self.Meta, 'expandable_fields', {}).get(name)
+            if serializer_class is not None:
+                fields[name] = serializer_class(source=fields[name].source, read_only=True)
+
+        only = {path.split('.')[0] for path in self.get_requested('fields')}
+        omit = {path for path in self.get_requested('omit') if '.' not in path}
+        for name in list(fields):
+            if (only and name not in only) or name in omit:
+                del fields[name]
+        return fields
+
+    def optimize_queryset(self, queryset, extra_columns=()):
+        """
+        Aplica al queryset lo que este serializador va a renderizar: select_related
+        y Prefetch para las relaciones anidadas y, en lecturas, only() con las
+        columnas de los campos incluidos.
+        """
+        columns, select, prefetch = self.get_query_plan()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columns is not None and self.is_dynamic:
+            queryset = queryset.only(*columns, *extra_columns)
+        return queryset
+
+    def get_query_plan(self, prefix=''):
+        """
+        Devuelve (columnas, select_related, prefetch_related) para los campos de este
+        serializador. Las columnas son None si algún campo no se corresponde con una
+        columna del modelo (propiedades, source='*'): en ese caso no se difiere nada.
+        """
+        model = self.Meta.model
+        columns, select, prefetch = set(), [], []
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                columns = None
+                continue
+
+            if isinstance(field, serializers.ListSerializer) and isinstance(field.child, DynamicFieldsMixin):
+                # Relación inversa o M2M: Prefetch con su propio queryset optimizado. En
+                # las inversas se carga la FK hacia el padre para asociar los resultados.
+                related_columns = [model_field.field.name] if model_field.one_to_many else []
+                related = field.child.optimize_queryset(
+                    model_field.related_model._default_manager.all(), extra_columns=related_columns,
+                )
+                prefetch.append(Prefetch(prefix + field.source, queryset=related))
+            elif isinstance(field, DynamicFieldsMixin) and model_field.concrete:
+                # FK expandida: se trae con un JOIN y solo las columnas que se renderizan.
+                path = f'{prefix}{field.source}__'
+                related_columns, related_select, related_prefetch = field.get_query_plan(path)
+                select.append(prefix + field.source)
+                select.extend(related_select)
+                prefetch.extend(related_prefetch)
+                if columns is not None:
+                    columns.add(field.source)
+                    if related_columns is not None:
+                        columns |= {f'{field.source}__{name}' for name in related_columns}
+            elif isinstance(field, serializers.BaseSerializer):
+                # Serializador anidado sin el mixin: se precarga completo.
+                (select if model_field.concrete else prefetch).append(prefix + field.source)
+                columns = None
+            elif model_field.concrete:
+                if columns is not None:
+                    columns.add(field.source)
+            else:
+                # Relación múltiple renderizada como ids (PrimaryKeyRelatedField many=True).
+                prefetch.append(prefix + field.source)
+        return columns, select, prefetch
+
+
+# Campos cuyo to_representation devuelve el mismo valor que entrega values().
+_IDENTITY_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField,
+)
+
+
+def _decimal_converter(field):
+    """Equivalente precompilado de DecimalField.to_representation (contexto y exponente fijos)."""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+    return convert
+
+
+def _datetime_converter(field):
+    """Equivalente precompilado de DateTimeField.to_representation para el formato ISO 8601."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _get_converter(field):
+    """Conversión de un valor no nulo de values() a su representación; None si no hace falta."""
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return lambda value: value.isoformat()
+        return field.to_representation
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return None
+    if isinstance(field, _IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Camino rápido de solo lectura para listados: compila un ModelSerializer (con
+    los campos ya resueltos por DynamicFieldsMixin) a una lista de columnas de
+    values() con su conversión precompilada, y arma cada fila como un dict plano
+    sin instanciar modelos ni recorrer la maquinaria de campos de DRF.
+
+    La salida es idéntica a serializer.data. Las relaciones inversas anidadas se
+    resuelven con una query por nivel agrupada por la FK, como el Prefetch de
+    optimize_queryset. Si algún campo no se puede compilar (propiedades,
+    SerializerMethodField, source='*') compile() devuelve None y se usa el
+    serializador normal.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # (nombre de salida, clave de values(), conversión, serializador anidado, es lista)
+        self.columns = []
+        self.has_related = False
+
+    @classmethod
+    def compile(cls, serializer, prefix=''):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        if not isinstance(serializer, serializers.ModelSerializer):
+            return None
+
+        model = serializer.Meta.model
+        compiled = cls(model)
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+
+            if isinstance(field, serializers.ListSerializer):
+                # Relación inversa: se consulta aparte y se agrupa por la FK hacia el padre.
+                child = cls.compile(field.child)
+                if child is None or prefix or not model_field.one_to_many:
+                    return None
+                compiled.columns.append((name, model_field.field.name, None, child, True))
+                compiled.has_related = True
+            elif isinstance(field, serializers.BaseSerializer):
+                # FK expandida: sus columnas vienen en la misma fila mediante JOIN.
+                child = cls.compile(field, prefix=f'{prefix}{field.source}__')
+                if child is None or child.has_related or not model_field.concrete:
+                    return None
+                compiled.columns.append((name, prefix + field.source, None, child, False))
+            elif model_field.concrete:
+                compiled.columns.append((name, prefix + field.source, _get_converter(field), None, False))
+            else:
+                return None
+        return compiled
+
+    def get_values_keys(self):
+        keys = []
+        for _, key, _, child, many in self.columns:
+            if many:
+                continue
+            keys.append(key)
+            if child is not None:
+                keys.extend(child.get_values_keys())
+        if self.has_related:
+            keys.append('pk')
+        return keys
+
+    def values(self, queryset, extra_keys=()):
+        """Queryset de dicts con las columnas necesarias (más `extra_keys`, ej. las del cursor)."""
+        keys = dict.fromkeys([*self.get_values_keys(), *extra_keys])
+        return queryset.prefetch_related(None).values(*keys)
+
+    def render(self, rows):
+        rows = list(rows)
+        related = {
+            name: self.fetch_related(child, fk_name, rows)
+            for name, fk_name, _, child, many in self.columns if many
+        }
+        return [self.render_row(row, related) for row in rows]
+
+    def render_row(self, row, related=None):
+        item = {}
+        for name, key, convert, child, many in self.columns:
+            if many:
+                item[name] = related[name].get(row['pk'], [])
+                continue
+            value = row[key]
+            if value is None:
+                item[name] = None
+            elif child is not None:
+                item[name] = child.render_row(row)
+            else:
+                item[name] = value if convert is None else convert(value)
+        return item
+
+    def fetch_related(self, child, fk_name, rows):
+        """Una query para los hijos de todas las filas, agrupados por el id del padre."""
+        children = {}
+        parent_ids = [row['pk'] for row in rows]
+        if not parent_ids:
+            return children
+        queryset = child.model._default_manager.filter(**{f'{fk_name}__in': parent_ids})
+        child_rows = list(child.values(queryset, extra_keys=[fk_name]))
+        for row, item in zip(child_rows, child.render(child_rows)):
+            children.setdefault(row[fk_name], []).append(item)
+        return children
@@ -0,0 +1,120 @@
+"""
+Pruebas de django_crud_api/authentication.py: la caché LRU y CachedJWTAuthentication.
+Los vencimientos se prueban con el reloj parcheado, sin esperas.
+"""
+import datetime
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken
+
+from customers.models import Customer
+
+from .authentication import LRUCache, token_cache, user_cache
+
+
+class LRUCacheTest(SimpleTestCase):
+    """
+    Pruebas de LRUCache: tamaño acotado y vencimiento por entrada.
+    """
+
+    def test_lru_is_bounded(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1, time.time() + 60)
+        cache.set('b', 2, time.time() + 60)
+        cache.get('a')
+        cache.set('c', 3, time.time() + 60)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_entries_expire_at_their_timestamp(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1, 1000)
+        with mock.patch('django_crud_api.authentication.time', **{'time.return_value': 999.5}):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('django_crud_api.authentication.time', **{'time.return_value': 1000}):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_zero_size_disables_cache(self):
+        cache = LRUCache(maxsize=0)
+        cache.set('a', 1, time.time() + 60)
+        self.assertIsNone(cache.get('a'))
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """
+    Pruebas de CachedJWTAuthentication: el usuario del token se resuelve desde la
+    caché y se invalida al guardarlo.
+    """
+
+    def setUp(self):
+        user_cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(username='operador', password='clave-segura-123', is_staff=True)
+        response = self.client.post('/api/login/', {'username': 'operador', 'password': 'clave-segura-123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _user_queries(self, url='/api/orders/'):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in ctx.captured_queries if 'auth_user' in query['sql']]
+
+    def test_user_is_loaded_once(self):
+        self.assertEqual(len(self._user_queries()), 1)
+        self.assertEqual(self._user_queries(), [])
+
+    def test_save_invalidates_cached_user(self):
+        """Desactivar al usuario corta el acceso de inmediato, sin esperar el TTL."""
+        self._user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_password_change_reloads_user(self):
+        self._user_queries()
+        self.user.set_password('otra-clave-456')
+        self.user.save()
+        self.assertEqual(len(self._user_queries()), 1)
+
+    def test_expired_entries_are_reloaded(self):
+        with self.settings(AUTH_USER_CACHE_TIMEOUT=0):
+            self._user_queries()
+            self.assertEqual(len(self._user_queries()), 1)
+
+    def test_stateless_mode_uses_token_claims(self):
+        """Sin consultar auth_user; is_staff viene del token y habilita IsAdminUser."""
+        customer = Customer.objects.create(first_name='Iván', last_name='Paz', email='ivan.paz@example.com')
+        with self.settings(AUTH_STATELESS_USERS=True), CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(f'/api/customers/{customer.id}/', {'city': 'Temuco'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('auth_user' in query['sql'] for query in ctx.captured_queries))
+
+    def test_token_signature_is_verified_once(self):
+        with mock.patch.object(TokenBackend, 'decode', autospec=True, side_effect=TokenBackend.decode) as decode:
+            for _ in range(3):
+                self._user_queries()
+        self.assertEqual(decode.call_count, 1)
+
+    def test_cached_token_is_rejected_after_exp(self):
+        """Pasado el 'exp', la entrada de la caché vence y simplejwt rechaza el token."""
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+
+        later = token['exp'] + 1
+        with mock.patch('django_crud_api.authentication.time', **{'time.return_value': later}), \
+                mock.patch('rest_framework_simplejwt.tokens.aware_utcnow',
+                           return_value=datetime.datetime.fromtimestamp(later, datetime.timezone.utc)):
+            self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer no-es-un-jwt')
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+        self.assertEqual(len(token_cache), 0)
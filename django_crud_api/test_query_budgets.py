@@ -0,0 +1,207 @@
+"""
+Presupuesto de queries por acción para todas las rutas de customers/urls.py,
+orders/urls.py y products/urls.py.
+
+Cada acción se ejecuta con dos tamaños de datos (SIZES): N clientes, N productos,
+N órdenes de N items cada una, y payloads de N líneas. Cada acción debe ejecutar
+la misma cantidad de queries con ambos tamaños y no superar max_queries. Si falla,
+el test muestra las queries agrupadas por fingerprint.
+
+La autenticación se fuerza (force_authenticate) y la caché se vacía antes de cada
+petición, así se mide el camino sin caché y sin la query del usuario.
+"""
+import collections
+import decimal
+import io
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APITestCase
+
+from customers.models import Customer
+from orders.models import Order, OrderItem
+from products.models import Product
+
+from .profiling import fingerprint
+
+SIZES = (2, 6)
+
+
+class QueryBudget(collections.namedtuple('QueryBudget', 'method path data max_queries')):
+    """`path` se completa con los ids del escenario; `data` es None o una función del escenario."""
+
+    def __new__(cls, method, path, max_queries, data=None):
+        return super().__new__(cls, method, path, data, max_queries)
+
+
+def order_payload(scenario):
+    return {
+        'customer': scenario['customer'],
+        'items': [{'product_id': pk, 'quantity': 2} for pk in scenario['products']],
+    }
+
+
+def order_update_payload(scenario):
+    """Cambia la cantidad de todas las líneas de la orden menos la última, que se elimina."""
+    return {
+        'customer': scenario['customer'],
+        'items': [{'product_id': pk, 'quantity': 3} for pk in scenario['products'][:-1]],
+    }
+
+
+def customer_payload(scenario):
+    return {'first_name': 'Nuevo', 'last_name': 'Cliente', 'email': f"nuevo{scenario['size']}@example.com"}
+
+
+def import_payload(scenario):
+    rows = ''.join(f'Importado {n},9.90,{n}\n' for n in range(scenario['size']))
+    upload = io.BytesIO(f'name,price,stock\n{rows}'.encode())
+    upload.name = 'productos.csv'
+    return {'file': upload}
+
+
+# Clave: '<basename>.<acción>' para las rutas de los routers y el nombre de la URL para las demás.
+BUDGETS = {
+    'customers.list': QueryBudget('get', '/api/customers/', 2),
+    'customers.create': QueryBudget('post', '/api/customers/', 2, customer_payload),
+    'customers.retrieve': QueryBudget('get', '/api/customers/{customer}/', 2),
+    'customers.update': QueryBudget('put', '/api/customers/{customer}/', 3, customer_payload),
+    'customers.partial_update': QueryBudget('patch', '/api/customers/{customer}/', 2, lambda s: {'city': 'Talca'}),
+    'customers.destroy': QueryBudget('delete', '/api/customers/{customer_without_pending}/', 7),
+    'customers-async-list': QueryBudget('get', '/api/async/customers/', 1),
+    'customers-async-detail': QueryBudget('get', '/api/async/customers/{customer}/', 1),
+    'token_obtain_pair': QueryBudget('post', '/api/login/', 1, lambda s: {'username': 'operador', 'password': 'clave-segura-123'}),
+
+    'products.list': QueryBudget('get', '/api/products/', 2),
+    'products.create': QueryBudget('post', '/api/products/', 1, lambda s: {'name': 'Nuevo', 'price': '5.00', 'stock': 3}),
+    'products.retrieve': QueryBudget('get', '/api/products/{product}/', 2),
+    'products.update': QueryBudget(
+        'put', '/api/products/{product}/', 2, lambda s: {'name': 'Renombrado', 'price': '5.00', 'stock': 50}),
+    'products.partial_update': QueryBudget('patch', '/api/products/{product}/', 2, lambda s: {'description': 'Nueva'}),
+    'products.destroy': QueryBudget('delete', '/api/products/{product}/', 5),
+    'products.mark_sold_out': QueryBudget('put', '/api/products/{product_without_stock}/mark_sold_out/', 3),
+    'products.increase_stock': QueryBudget('post', '/api/products/{product}/increase_stock/', 3, lambda s: {'amount': 5}),
+    'products.bulk_import': QueryBudget('post', '/api/products/import/', 3, import_payload),
+    'products.search': QueryBudget('get', '/api/products/search/?q=producto&page_size=50', 2),
+    'products-async-list': QueryBudget('get', '/api/async/products/', 1),
+    'products-async-detail': QueryBudget('get', '/api/async/products/{product}/', 1),
+
+    'orders.list': QueryBudget('get', '/api/orders/', 2),
+    'orders.create': QueryBudget('post', '/api/orders/', 10, order_payload),
+    'orders.retrieve': QueryBudget('get', '/api/orders/{order}/', 2),
+    'orders.update': QueryBudget('put', '/api/orders/{order}/', 16, order_update_payload),
+    'orders.partial_update': QueryBudget('patch', '/api/orders/{order}/', 5, lambda s: {'status': 'shipped'}),
+    'orders.destroy': QueryBudget('delete', '/api/orders/{order}/', 4),
+    'orders.export': QueryBudget('get', '/api/orders/export/', 3),
+}
+
+
+def iter_route_keys(patterns, apps=('customers', 'orders', 'products')):
+    """Claves de BUDGETS para todas las rutas cuyas vistas pertenecen a `apps`."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_route_keys(pattern.url_patterns, apps)
+            continue
+        callback = pattern.callback
+        view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+        if (view_class or callback).__module__.split('.')[0] not in apps:
+            continue
+        # Los routers de DRF generan una vista por ruta con el mapeo {método: acción}.
+        actions = getattr(callback, 'actions', None)
+        if actions:
+            for action in actions.values():
+                yield f"{callback.initkwargs['basename']}.{action}"
+        else:
+            yield pattern.name
+
+
+class QueryBudgetTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='operador', password='clave-segura-123', is_staff=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def build_scenario(self, size):
+        """Datos de tamaño N (ver el docstring del módulo); devuelve los ids que usan las rutas."""
+        for model in (OrderItem, Order, Customer, Product):
+            model.objects.all().delete()
+
+        customer, customer_without_pending = (
+            Customer.objects.create(first_name=f'Cliente {n}', last_name='Prueba', email=f'cliente{n}@example.com')
+            for n in range(2)
+        )
+        Customer.objects.bulk_create(
+            Customer(first_name=f'Cliente {n}', last_name='Prueba', email=f'cliente{n}@example.com')
+            for n in range(2, size)
+        )
+        products = [
+            Product.objects.create(name=f'Producto {n}', price=decimal.Decimal('10.00'), stock=1000)
+            for n in range(size)
+        ]
+        product_without_stock = Product.objects.create(name='Agotado', price=decimal.Decimal('1.00'), stock=0)
+
+        # N órdenes pendientes con N items del cliente principal, y N órdenes entregadas
+        # de un item del cliente que se puede eliminar.
+        for _ in range(size):
+            order = Order.objects.create(customer=customer, total_amount=decimal.Decimal('20.00') * size)
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=product, quantity=2, price_at_order=product.price)
+                for product in products
+            )
+            order = Order.objects.create(customer=customer_without_pending, total_amount=decimal.Decimal('10.00'), status='delivered')
+            OrderItem.objects.create(order=order, product=products[-1], quantity=1, price_at_order=products[-1].price)
+        return {
+            'size': size,
+            'customer': customer.pk,
+            'customer_without_pending': customer_without_pending.pk,
+            'product': products[0].pk,
+            'product_without_stock': product_without_stock.pk,
+            'products': [product.pk for product in products],
+            'order': Order.objects.filter(customer=customer).earliest('pk').pk,
+        }
+
+    def measure(self, budget, size):
+        scenario = self.build_scenario(size)
+        data = budget.data(scenario) if budget.data else None
+        request_format = 'multipart' if data and any(hasattr(value, 'read') for value in data.values()) else 'json'
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, budget.method)(budget.path.format(**scenario), data, format=request_format)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, getattr(response, 'data', None))
+        return [query['sql'] for query in ctx.captured_queries]
+
+    def format_queries(self, queries):
+        counts = collections.Counter(fingerprint(sql) for sql in queries)
+        return '\n'.join(f'  {count} x {sql}' for sql, count in counts.most_common())
+
+    def test_every_route_has_a_budget(self):
+        keys = set(iter_route_keys(get_resolver().url_patterns))
+        self.assertEqual(sorted(keys - set(BUDGETS)), [], "Rutas sin presupuesto de queries")
+        self.assertEqual(sorted(set(BUDGETS) - keys), [], "Presupuestos de rutas que ya no existen")
+
+    def test_query_budgets(self):
+        for key, budget in BUDGETS.items():
+            with self.subTest(key):
+                counts = {}
+                for size in SIZES:
+                    queries = self.measure(budget, size)
+                    counts[size] = len(queries)
+                    self.assertLessEqual(
+                        len(queries), budget.max_queries,
+                        f"{key}: {len(queries)} queries con N={size} (presupuesto {budget.max_queries}):\n"
+                        f"{self.format_queries(queries)}",
+                    )
+                small, large = SIZES
+                self.assertEqual(
+                    counts[small], counts[large],
+                    f"{key}: las queries crecen con N ({counts[small]} con N={small}, {counts[large]} con N={large}):\n"
+                    f"{self.format_queries(queries)}",
+                )
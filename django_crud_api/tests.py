@@ -0,0 +1,447 @@
+import contextvars
+import decimal
+import gzip
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from customers.models import Customer
+from orders.views import OrderViewSet
+from products.models import InsufficientStock, Product
+from .db_routers import read_from, use_primary
+from .metrics import CONTENT_TYPE, registry
+from .middleware import ProfilingMiddleware, QueryCounter, ReplicaRoutingMiddleware, execute_wrapper_all
+from .profiling import fingerprint
+from .schema import PrecomputedSpectacularAPIView, accepts_gzip
+
+SCHEMA_FILE = Path(settings.BASE_DIR) / 'schema.yml'
+
+
+class SchemaDriftTest(SimpleTestCase):
+    """
+    El schema.yml versionado debe coincidir con el que genera el código actual.
+    Si falla, regenerarlo con: python manage.py spectacular --file schema.yml
+    """
+
+    def test_committed_schema_is_up_to_date(self):
+        with tempfile.TemporaryDirectory() as directory:
+            generated = Path(directory) / 'schema.yml'
+            call_command('spectacular', file=str(generated), fail_on_warn=True)
+            self.assertEqual(generated.read_text(encoding='utf-8'), SCHEMA_FILE.read_text(encoding='utf-8'))
+
+
+class PrecomputedSchemaViewTest(SimpleTestCase):
+    """
+    Pruebas de GET /api/schema/: se genera una vez (al arrancar, con warm_up) y se sirve
+    desde memoria con ETag y gzip.
+    """
+
+    def setUp(self):
+        PrecomputedSpectacularAPIView.clear_cache()
+        self.addCleanup(PrecomputedSpectacularAPIView.clear_cache)
+
+    def test_schema_is_generated_once(self):
+        with mock.patch.object(SchemaGenerator, 'get_schema', autospec=True, side_effect=SchemaGenerator.get_schema) as get_schema:
+            first = self.client.get('/api/schema/')
+            second = self.client.get('/api/schema/')
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertIn('filename=', second['Content-Disposition'])
+
+    def test_etag_returns_not_modified(self):
+        response = self.client.get('/api/schema/')
+        cached = self.client.get('/api/schema/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+
+    def test_gzip_and_json_variants(self):
+        plain = self.client.get('/api/schema/?format=json')
+        compressed = self.client.get('/api/schema/?format=json', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertNotEqual(compressed['ETag'], plain['ETag'])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertIn('paths', json.loads(plain.content))
+
+    def test_warm_up_builds_every_format_before_the_first_request(self):
+        """warm_up() genera el esquema una vez y las peticiones ya no introspeccionan las vistas."""
+        lazy = [self.client.get('/api/schema/').content, self.client.get('/api/schema/?format=json').content]
+        PrecomputedSpectacularAPIView.clear_cache()
+
+        with mock.patch.object(SchemaGenerator, 'get_schema', autospec=True, side_effect=SchemaGenerator.get_schema) as get_schema:
+            PrecomputedSpectacularAPIView.warm_up()
+            self.assertEqual(get_schema.call_count, 1)
+            warm = [self.client.get('/api/schema/').content, self.client.get('/api/schema/?format=json').content]
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(warm, lazy)
+
+    def test_accept_encoding_quality_values(self):
+        """gzip;q=0 no cuenta como gzip; '*' lo acepta si gzip no aparece."""
+        cases = {
+            'gzip': True, 'br, GZIP;q=0.5': True, 'br, *': True, 'x-gzip': True,
+            'gzip;q=0': False, 'gzip; q=0.0, br': False, '*;q=0': False, 'gzip;q=0, *': False,
+            'identity': False, '': False, 'gzipx': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertIs(accepts_gzip(header), expected)
+
+        response = self.client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip;q=0, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_serves_committed_file_without_introspection(self):
+        with self.settings(API_SCHEMA_FILE=str(SCHEMA_FILE)), \
+                mock.patch.object(SchemaGenerator, 'get_schema') as get_schema:
+            response = self.client.get('/api/schema/', HTTP_ACCEPT='application/vnd.oai.openapi')
+        get_schema.assert_not_called()
+        self.assertEqual(response.content, SCHEMA_FILE.read_bytes())
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTest(APITestCase):
+    """
+    Lecturas a réplicas y escrituras al primario. La réplica 'replica_1' se
+    registra como espejo de la conexión de prueba (como TEST MIRROR); un alias
+    sin conexión ('sin_replica') sirve para comprobar que algo no lee de réplicas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='operador', password='clave-segura-123')
+        cls.customer = Customer.objects.create(first_name='Eva', last_name='Rojas', email='eva.rojas@example.com')
+        cls.product = Product.objects.create(name='Teclado', price=decimal.Decimal('30.00'), stock=5)
+
+    def setUp(self):
+        cache.clear()
+        connections['replica_1'] = connections['default']
+        self.addCleanup(delattr, connections._connections, 'replica_1')
+        self.middleware = ReplicaRoutingMiddleware(self.record_read_database)
+        self.factory = RequestFactory()
+
+    def record_read_database(self, request):
+        self.read_database = Product.objects.all().db
+        return HttpResponse(status=getattr(request, 'response_status', 200))
+
+    def request(self, method, authorization=None, status=200):
+        headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        request = getattr(self.factory, method)('/api/products/', **headers)
+        request.response_status = status
+        self.middleware(request)
+        return self.read_database
+
+    def test_router_uses_primary_outside_requests(self):
+        self.assertEqual(Product.objects.all().db, 'default')
+        with read_from('replica_1'):
+            self.assertEqual(Product.objects.all().db, 'replica_1')
+            self.assertEqual(router.db_for_write(Product), 'default')
+            with use_primary():
+                self.assertEqual(Product.objects.all().db, 'default')
+
+    def test_safe_methods_read_from_replica(self):
+        self.assertEqual(self.request('get'), 'replica_1')
+        self.assertEqual(self.request('head'), 'replica_1')
+        self.assertEqual(self.request('post', 'Bearer a'), 'default')
+        self.assertEqual(Product.objects.all().db, 'default')
+
+    def test_write_pins_client_to_primary(self):
+        self.request('post', 'Bearer a')
+        self.assertEqual(self.request('get', 'Bearer a'), 'default')
+        # Otro cliente (u otro token) sigue leyendo de la réplica.
+        self.assertEqual(self.request('get', 'Bearer b'), 'replica_1')
+        self.assertEqual(self.request('get'), 'replica_1')
+
+    async def test_async_requests_route_without_a_thread(self):
+        """Con un get_response async el middleware también es async y la réplica llega a la vista."""
+        async def record_read_database(request):
+            return self.record_read_database(request)
+
+        middleware = ReplicaRoutingMiddleware(record_read_database)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        await middleware(self.factory.get('/api/async/products/'))
+        self.assertEqual(self.read_database, 'replica_1')
+        request = self.factory.post('/api/products/', HTTP_AUTHORIZATION='Bearer a')
+        request.response_status = 201
+        await middleware(request)
+        await middleware(self.factory.get('/api/async/products/', HTTP_AUTHORIZATION='Bearer a'))
+        self.assertEqual(self.read_database, 'default')
+
+    def test_failed_write_does_not_pin(self):
+        self.request('post', 'Bearer a', status=400)
+        self.assertEqual(self.request('get', 'Bearer a'), 'replica_1')
+
+    @override_settings(DB_PRIMARY_STICKY_SECONDS=1)
+    def test_pin_lasts_sticky_window(self):
+        with mock.patch('django_crud_api.middleware.cache.set') as cache_set:
+            self.request('post', 'Bearer a')
+        self.assertEqual(cache_set.call_args.args[2], 1)
+
+    @override_settings(PRODUCT_CACHE_TIMEOUT=0)
+    def test_list_is_served_from_replica(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connections['replica_1']) as ctx:
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['name'], 'Teclado')
+        self.assertTrue(ctx.captured_queries)
+
+    @override_settings(DATABASE_REPLICAS=['sin_replica'])
+    def test_catalog_cache_is_filled_from_primary(self):
+        """Lo que se guarda en la caché del catálogo nunca se lee de una réplica (que puede estar atrasada)."""
+        # 'sin_replica' no tiene conexión: cualquier lectura desde ella fallaría.
+        response = self.client.get('/api/products/')
+        detail = self.client.get(f'/api/products/{self.product.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(detail.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/products/').data, response.data)
+
+    @override_settings(DATABASE_REPLICAS=['sin_replica'])
+    def test_order_create_uses_primary(self):
+        """OrderViewSet valida y escribe en el primario aunque la petición tenga réplica asignada."""
+        request = APIRequestFactory().post('/api/orders/', {
+            'customer': self.customer.pk,
+            'items': [{'product_id': self.product.pk, 'quantity': 2}],
+        }, format='json')
+        force_authenticate(request, user=self.user)
+        with read_from('sin_replica'):
+            response = OrderViewSet.as_view({'post': 'create'})(request)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+
+    def test_stock_shortage_is_read_from_primary(self):
+        with read_from('sin_replica'), self.assertRaises(InsufficientStock) as ctx:
+            Product.objects.apply_stock_deltas({self.product.pk: 10})
+        self.assertEqual(ctx.exception.product_ids, [self.product.pk])
+
+
+# Sin la caché del catálogo, así cada listado de productos consulta la base de datos.
+@override_settings(PRODUCT_CACHE_TIMEOUT=0)
+class MetricsTest(APITestCase):
+    """Telemetría por endpoint (MetricsMiddleware) y su exportación en /metrics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='operador', password='clave-segura-123')
+        Product.objects.create(name='Teclado', price=decimal.Decimal('30.00'), stock=5)
+
+    def setUp(self):
+        registry.clear()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        return response.content.decode()
+
+    def test_records_route_action_and_status(self):
+        self.client.get('/api/products/')
+        self.client.get('/api/products/')
+        self.client.get('/api/products/999999/')
+        body = self.scrape()
+
+        labels = 'view="products-list",action="list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', body)
+        self.assertIn('http_requests_total{view="products-detail",action="retrieve",method="GET",status="404"} 1', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}} 2', body)
+        # Las peticiones del listado consultan la base de datos: ninguna cae en el bucket le="0".
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="0"}} 0', body)
+        self.assertIn(f'http_request_db_queries_count{{{labels}}} 2', body)
+
+    def test_query_count_matches_executed_queries(self):
+        with CaptureQueriesContext(connections['default']) as ctx:
+            self.client.get('/api/products/')
+        snapshot = registry.snapshot()
+        labels = (('view', 'products-list'), ('action', 'list'), ('method', 'GET'))
+        data = snapshot['histograms'][('http_request_db_queries', labels)]
+        self.assertEqual(data[-1], len(ctx.captured_queries))
+
+    async def test_async_views_are_recorded(self):
+        """Bajo ASGI se registran la ruta y las queries que el ORM async ejecuta en su hilo."""
+        response = await self.async_client.get('/api/async/products/')
+        self.assertEqual(response.status_code, 200)
+        labels = (('view', 'products-async-list'), ('action', ''), ('method', 'GET'))
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['counters'][('http_requests_total', (*labels, ('status', '200')))], 1)
+        self.assertEqual(snapshot['histograms'][('http_request_db_queries', labels)][-1], 1)
+
+    def test_query_counter_follows_context_into_other_threads(self):
+        """Como bajo ASGI: la query corre en otro hilo (otra conexión) con una copia del contexto."""
+        def query_in_thread():
+            try:
+                with connections['default'].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            finally:
+                connections.close_all()
+
+        queries = QueryCounter()
+        with execute_wrapper_all(queries), ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(contextvars.copy_context().run, query_in_thread).result()
+        self.assertEqual(queries.count, 1)
+
+    def test_unmatched_paths_share_one_series(self):
+        self.client.get('/no-existe/1/')
+        self.client.get('/no-existe/2/')
+        self.assertIn('http_requests_total{view="unmatched",action="",method="GET",status="404"} 2', self.scrape())
+
+    def test_counters_are_per_thread_and_summed(self):
+        labels = (('view', 'x'), ('action', ''), ('method', 'GET'))
+
+        def record():
+            for _ in range(100):
+                registry.inc('http_requests_total', labels)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(4):
+                executor.submit(record)
+        self.assertEqual(registry.snapshot()['counters'][('http_requests_total', labels)], 400)
+
+    def test_multiprocess_directory_is_aggregated(self):
+        labels = [['view', 'products-list'], ['action', 'list'], ['method', 'GET'], ['status', '200']]
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            # Snapshot de otro worker.
+            Path(directory, 'metrics_1.json').write_text(json.dumps({
+                'counters': [['http_requests_total', labels, 5]], 'histograms': [],
+            }))
+            self.client.get('/api/products/')
+            body = self.scrape()
+            self.assertTrue(Path(directory, f'metrics_{os.getpid()}.json').exists())
+        self.assertIn('http_requests_total{view="products-list",action="list",method="GET",status="200"} 6', body)
+
+
+class FingerprintTest(SimpleTestCase):
+
+    def test_values_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT "t"."id" FROM "t" WHERE "t"."id" = %s AND "t"."name" = \'x\'  LIMIT 21'),
+            'SELECT "t"."id" FROM "t" WHERE "t"."id" = ? AND "t"."name" = ? LIMIT ?',
+        )
+
+    def test_in_lists_and_values_rows_collapse(self):
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'), 'SELECT * FROM t WHERE id IN (...)')
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s)'), 'SELECT * FROM t WHERE id IN (...)')
+        self.assertEqual(
+            fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)'),
+            'INSERT INTO t (a, b) VALUES (?, ?), ...',
+        )
+
+    def test_identifiers_keep_their_digits(self):
+        self.assertEqual(fingerprint('SELECT T2."id" FROM t T2'), 'SELECT T2."id" FROM t T2')
+
+
+@override_settings(
+    PROFILE_REQUESTS=True, PROFILE_SLOW_REQUEST_MS=0, PROFILE_SLOW_QUERY_MS=10_000,
+    PROFILE_SAMPLE_INTERVAL_MS=1, PRODUCT_CACHE_TIMEOUT=0,
+)
+class ProfilingMiddlewareTest(APITestCase):
+    """Registros JSONL de ProfilingMiddleware (umbral 0: toda petición es lenta)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='operador', password='clave-segura-123')
+        Product.objects.create(name='Teclado', price=decimal.Decimal('30.00'), stock=5)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_file = Path(directory.name) / 'profile.jsonl'
+        override = override_settings(PROFILE_LOG_FILE=str(self.log_file))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_authenticate(self.user)
+
+    def read_records(self):
+        return [json.loads(line) for line in self.log_file.read_text(encoding='utf-8').splitlines()]
+
+    def test_slow_request_records_sql_timeline(self):
+        self.client.get('/api/products/')
+        [record] = self.read_records()
+        self.assertEqual(record['type'], 'slow_request')
+        self.assertEqual((record['view'], record['action'], record['status']), ('products-list', 'list', 200))
+        self.assertTrue(record['queries'])
+        self.assertIn('products_product', record['queries'][0]['sql'])
+        self.assertIn('hot_spots', record)
+
+    def test_duplicate_queries_are_grouped(self):
+        def n_plus_one(request):
+            for product in Product.objects.all():
+                list(Product.objects.filter(pk=product.pk))
+                list(Product.objects.filter(pk=product.pk))
+            return HttpResponse()
+
+        ProfilingMiddleware(n_plus_one)(RequestFactory().get('/x/'))
+        [record] = self.read_records()
+        [duplicate] = record['duplicates']
+        self.assertEqual(duplicate['count'], 2)
+        self.assertIn('WHERE "products_product"."id" = ?', duplicate['fingerprint'])
+
+    def test_sampler_records_hot_spots(self):
+        def busy(request):
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+            return HttpResponse()
+
+        ProfilingMiddleware(busy)(RequestFactory().get('/x/'))
+        [record] = self.read_records()
+        self.assertGreater(record['samples'], 0)
+        self.assertIn('busy', [spot['function'] for spot in record['hot_spots']])
+
+    async def test_async_request_records_queries(self):
+        async def view(request):
+            await Product.objects.acount()
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(RequestFactory().get('/x/'))
+        [record] = self.read_records()
+        self.assertEqual(len(record['queries']), 1)
+        self.assertEqual(record['samples'], 0)
+
+    @override_settings(DEBUG=True)
+    def test_asgi_chain_has_no_sync_middleware(self):
+        """Bajo ASGI ningún middleware obliga a Django a correr la cadena en un hilo."""
+        handler = ASGIHandler.__new__(ASGIHandler)
+        # Django registra en django.request cada middleware que tiene que adaptar.
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            handler.load_middleware(is_async=True)
+
+    @override_settings(PROFILE_SLOW_REQUEST_MS=10_000, PROFILE_SLOW_QUERY_MS=0)
+    def test_slow_query_captures_explain(self):
+        self.client.get('/api/products/')
+        records = self.read_records()
+        self.assertTrue(records)
+        self.assertEqual({record['type'] for record in records}, {'slow_query'})
+        self.assertTrue(all(record['sql'].startswith('SELECT') for record in records))
+        self.assertIsInstance(records[0]['explain'], list)
+        self.assertTrue(records[0]['explain'])
+
+    @override_settings(PROFILE_REQUESTS=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: HttpResponse())
+        self.client.get('/api/products/')
+        self.assertFalse(self.log_file.exists())
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic.base import RedirectView
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from .metrics import metrics_view
+from .schema import PrecomputedSpectacularAPIView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -16,9 +18,11 @@ urlpatterns = [
 
     
 
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", PrecomputedSpectacularAPIView.as_view(), name="schema"),
     path("api/schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("api/schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
 
+    path("metrics", metrics_view, name="metrics"),
+
     path("", RedirectView.as_view(url="api/schema/swagger-ui/", permanent=False), name="index_to_swagger"),
 ]
@@ -0,0 +1,96 @@
+import csv
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from django_crud_api.renderers import dumps
+
+from .models import OrderItem
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CSV_COLUMNS = [
+    'order_id', 'customer_id', 'order_date', 'status', 'total_amount',
+    'item_id', 'product_id', 'product_name', 'quantity', 'price_at_order',
+]
+
+# Mismo formato de fechas que la API (DRF conserva los microsegundos y usa 'Z' para UTC).
+format_datetime = serializers.DateTimeField().to_representation
+
+
+def iter_orders(queryset, chunk_size):
+    """
+    Recorre las órdenes por id en bloques de `chunk_size`, precargando items y
+    productos de cada bloque con dos queries. Cada bloque es una consulta corta
+    (WHERE id > último id), así la memoria se mantiene constante y no se deja un
+    cursor abierto durante toda la exportación.
+    """
+    items = Prefetch(
+        'items',
+        queryset=OrderItem.objects.select_related('product').only(
+            'id', 'order', 'quantity', 'price_at_order', 'product__id', 'product__name',
+        ),
+    )
+    queryset = queryset.order_by('id').prefetch_related(items)
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1].id
+
+
+def order_to_dict(order):
+    return {
+        'id': order.id,
+        'customer': order.customer_id,
+        'order_date': format_datetime(order.order_date),
+        'status': order.status,
+        'total_amount': str(order.total_amount),
+        'items': [
+            {
+                'id': item.id,
+                'product_id': item.product_id,
+                'product_name': item.product.name,
+                'quantity': item.quantity,
+                'price_at_order': str(item.price_at_order),
+            }
+            for item in order.items.all()
+        ],
+    }
+
+
+def stream_ndjson(orders):
+    for order in orders:
+        yield dumps(order_to_dict(order)) + b'\n'
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve cada línea en vez de acumularla."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(orders):
+    """Una fila por línea de pedido; los pedidos sin items ocupan una fila sin datos de item."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS).encode()
+    for order in orders:
+        data = order_to_dict(order)
+        head = [data['id'], data['customer'], data['order_date'], data['status'], data['total_amount']]
+        for item in data['items'] or [None]:
+            tail = [''] * 5 if item is None else [
+                item['id'], item['product_id'], item['product_name'], item['quantity'], item['price_at_order'],
+            ]
+            yield writer.writerow(head + tail).encode()
+
+
+EXPORT_STREAMS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+}
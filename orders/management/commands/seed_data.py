@@ -0,0 +1,133 @@
+import decimal
+import random
+from array import array
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers.models import Customer
+from orders.models import Order, OrderItem
+from products.cache import bump_catalog_version
+from products.models import Product
+
+STATUSES = ['pending', 'shipped', 'delivered', 'cancelled']
+CITIES = ['Santiago', 'Valparaíso', 'Concepción', 'La Serena', 'Antofagasta', 'Temuco', 'Puerto Montt']
+FIRST_NAMES = ['Ana', 'Juan', 'María', 'Pedro', 'Camila', 'Diego', 'Valentina', 'Matías', 'Sofía', 'Tomás']
+LAST_NAMES = ['González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva', 'Martínez', 'Sepúlveda']
+# Vocabulario de nombres y descripciones de productos, para que la búsqueda tenga texto realista.
+PRODUCT_NOUNS = [
+    'Taza', 'Lámpara', 'Silla', 'Mochila', 'Audífonos', 'Cuaderno', 'Botella', 'Teclado',
+    'Chaqueta', 'Reloj', 'Mesa', 'Cafetera', 'Zapatilla', 'Parlante', 'Cojín', 'Estante',
+]
+PRODUCT_ADJECTIVES = [
+    'premium', 'vintage', 'resistente', 'flexible', 'portátil', 'impermeable', 'elegante', 'minimalista',
+]
+PRODUCT_MATERIALS = ['acero', 'madera', 'cuero', 'algodón', 'bambú', 'vidrio', 'cerámica', 'aluminio']
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera clientes, productos, órdenes e items sintéticos con bulk_create, para "
+        "pruebas de rendimiento. Con la misma --seed sobre una base vacía genera los mismos datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=2000)
+        parser.add_argument('--max-items-per-order', type=int, default=5, help="Cada orden tiene entre 1 y este número de items.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        customer_ids = self.create_customers(options['customers'], options['seed'])
+        product_ids, prices = self.create_products(options['products'])
+        if options['orders'] and not (customer_ids and product_ids):
+            self.stderr.write("Se necesitan clientes y productos para generar órdenes.")
+            return
+        self.create_orders(options['orders'], options['max_items_per_order'], customer_ids, product_ids, prices)
+
+    def bulk_create(self, model, objects):
+        """Inserta `objects` y devuelve los ids nuevos en orden (también en motores sin RETURNING)."""
+        last_id = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        with transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+        return array('q', model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True))
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(start + self.batch_size, total)
+
+    def create_customers(self, total, seed):
+        offset = Customer.objects.count()
+        ids = array('q')
+        for start, end in self.batches(total):
+            ids.extend(self.bulk_create(Customer, [
+                Customer(
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    # Único aunque el comando se ejecute varias veces.
+                    email=f'cliente{offset + n}.s{seed}@example.com',
+                    phone_number=f'+569{self.rng.randrange(10**7, 10**8)}',
+                    city=self.rng.choice(CITIES),
+                    address_line_1=f'Calle {self.rng.randrange(1, 5000)}',
+                )
+                for n in range(start, end)
+            ]))
+            self.stdout.write(f"Clientes: {end}/{total}")
+        return ids
+
+    def create_products(self, total):
+        ids, prices = array('q'), []
+        for start, end in self.batches(total):
+            products = [
+                Product(
+                    name=f'{self.rng.choice(PRODUCT_NOUNS)} {self.rng.choice(PRODUCT_ADJECTIVES)} {n}',
+                    description=(
+                        f'Fabricado en {self.rng.choice(PRODUCT_MATERIALS)}, '
+                        f'{self.rng.choice(PRODUCT_ADJECTIVES)} y {self.rng.choice(PRODUCT_ADJECTIVES)}.'
+                    ),
+                    price=decimal.Decimal(self.rng.randrange(100, 100000)) / 100,
+                    stock=self.rng.randrange(0, 500),
+                )
+                for n in range(start, end)
+            ]
+            for product in products:
+                product.is_active = product.stock > 0
+            ids.extend(self.bulk_create(Product, products))
+            prices.extend(product.price for product in products)
+            self.stdout.write(f"Productos: {end}/{total}")
+        if total:
+            # bulk_create no dispara señales: el catálogo cacheado se invalida a mano.
+            bump_catalog_version()
+        return ids, prices
+
+    def create_orders(self, total, max_items, customer_ids, product_ids, prices):
+        """Órdenes con su total ya calculado: bulk_create no dispara la señal que lo recalcula."""
+        max_items = max(1, min(max_items, len(product_ids)))
+        created_items = 0
+        for start, end in self.batches(total):
+            orders, lines = [], []
+            for _ in range(start, end):
+                picked = self.rng.sample(range(len(product_ids)), self.rng.randint(1, max_items))
+                order_lines = [(product_ids[i], self.rng.randint(1, 5), prices[i]) for i in picked]
+                orders.append(Order(
+                    customer_id=self.rng.choice(customer_ids),
+                    status=self.rng.choice(STATUSES),
+                    total_amount=sum((price * quantity for _, quantity, price in order_lines), decimal.Decimal('0.00')),
+                ))
+                lines.append(order_lines)
+
+            order_ids = self.bulk_create(Order, orders)
+            items = [
+                OrderItem(order_id=order_id, product_id=product_id, quantity=quantity, price_at_order=price)
+                for order_id, order_lines in zip(order_ids, lines)
+                for product_id, quantity, price in order_lines
+            ]
+            with transaction.atomic():
+                OrderItem.objects.bulk_create(items, batch_size=self.batch_size)
+            created_items += len(items)
+            self.stdout.write(f"Órdenes: {end}/{total} ({created_items} items)")
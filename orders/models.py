@@ -1,10 +1,17 @@
 # models.py en la app orders
 
+import decimal
+
 from django.db import models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from customers.models import Customer
 from products.models import Product  
 
+# Tipo de salida para las sumas de subtotales (mismo formato que total_amount)
+TOTAL_FIELD = models.DecimalField(max_digits=10, decimal_places=2)
+
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     order_date = models.DateTimeField(auto_now_add=True)
@@ -16,14 +23,45 @@ class Order(models.Model):
         ('cancelled', 'Cancelado'),
     ], default='pending')
 
+    class Meta:
+        indexes = [
+            # Búsqueda de pedidos por cliente y estado (ej. pedidos pendientes antes de eliminar un cliente).
+            models.Index(fields=['customer', 'status'], name='order_customer_status_idx'),
+            # Ordenamiento y paginación por cursor del listado (-order_date, -id).
+            models.Index(fields=['order_date', 'id'], name='order_date_idx'),
+        ]
+
     def __str__(self):
         return f"Pedido {self.id} de {self.customer.full_name}"
     
+    @classmethod
+    def recalculate_total(cls, order_id):
+        """
+        Recalcula total_amount en la base de datos con un único UPDATE.
+        La suma se evalúa dentro de la misma sentencia, por lo que el resultado
+        es consistente aunque otros items del pedido se modifiquen en paralelo.
+        """
+        return cls.recalculate_totals([order_id])
+
+    @classmethod
+    def recalculate_totals(cls, order_ids):
+        """Igual que recalculate_total, para varias órdenes en el mismo UPDATE."""
+        items_total = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum(ExpressionWrapper(
+                F('quantity') * F('price_at_order'), output_field=TOTAL_FIELD
+            )))
+            .values('total')
+        )
+        return cls.objects.filter(pk__in=order_ids).update(
+            total_amount=Coalesce(Subquery(items_total, output_field=TOTAL_FIELD), Value(decimal.Decimal('0.00')))
+        )
+
     def calculate_total_amount(self):
-        """Calcula el total del pedido sumando los OrderItems."""
-        total = sum(item.subtotal for item in self.items.all())
-        self.total_amount = total or 0
-        self.save()
+        """Calcula el total del pedido sumando los OrderItems en la base de datos."""
+        Order.recalculate_total(self.pk)
+        self.refresh_from_db(fields=['total_amount'])
     
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items') # Relaciona con Order
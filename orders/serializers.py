@@ -1,15 +1,35 @@
 import decimal # Importante para manejar precios con decimales
+from django.db import transaction
 from rest_framework import serializers
-from products.models import Product
+from django_crud_api.serializers import DynamicFieldsMixin
+from products.models import InsufficientStock, Product
 from .models import Order, OrderItem
+from .signals import defer_total_updates
 
 from products.serializers import ProductSerializer 
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True) 
+
+def reserve_stock(deltas):
+    """
+    Reserva (o devuelve, si la cantidad es negativa) stock para {product_id: cantidad}
+    de forma atómica. Debe llamarse dentro de la transacción del pedido.
+    """
+    try:
+        Product.objects.apply_stock_deltas(deltas)
+    except InsufficientStock as exc:
+        raise serializers.ValidationError({
+            'items': [f'Stock insuficiente para el producto {pk}.' for pk in exc.product_ids]
+        })
+
+
+class OrderItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Por defecto solo el id del producto; ?expand=items.product devuelve el objeto completo.
+    product = serializers.PrimaryKeyRelatedField(read_only=True)
     # product_id es el campo que el cliente enviará para crear/actualizar un OrderItem.
-    product_id = serializers.PrimaryKeyRelatedField(
-        queryset=Product.objects.all(), 
+    # Es un entero y no un PrimaryKeyRelatedField: OrderSerializer.validate_items
+    # resuelve los productos de todas las líneas con una sola query.
+    product_id = serializers.IntegerField(
+        min_value=1,
         write_only=True # <-- ¡Crucial para que no aparezca en la respuesta!
     )
     
@@ -18,12 +38,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'product_id', 'quantity', 'price_at_order']
        
         read_only_fields = ['price_at_order'] # El cliente no debe enviar este campo, se calcula automáticamente.
+        expandable_fields = {'product': ProductSerializer}
     def validate_quantity(self, value):
         if value <= 0:
             raise serializers.ValidationError("La cantidad de un ítem debe ser un número positivo.")
         return value
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # many=True indica que esperamos una lista de objetos OrderItem.
     items = OrderItemSerializer(many=True)
 
@@ -40,39 +61,121 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['order_date', 'total_amount', 'status'] 
         # ******************************
 
+    def validate_items(self, items_data):
+        """
+        Resuelve los productos de todas las líneas con un único SELECT ... WHERE id IN
+        y reemplaza product_id por la instancia en 'product', que luego se usa para el
+        precio. Los errores se informan por línea: producto inexistente, inactivo o
+        repetido. Al actualizar, un producto inactivo (ej. agotado por este mismo
+        pedido) se acepta si ya estaba en la orden.
+        """
+        product_ids = {item_data['product_id'] for item_data in items_data}
+        products = Product.objects.in_bulk(product_ids)
+
+        inactive = {pk for pk, product in products.items() if not product.is_active}
+        if inactive and self.instance is not None:
+            inactive -= set(self.instance.items.filter(product_id__in=inactive).values_list('product_id', flat=True))
+
+        errors, seen = [], set()
+        for item_data in items_data:
+            pk = item_data['product_id']
+            if pk not in products:
+                errors.append({'product_id': [f'El producto {pk} no existe.']})
+            elif pk in inactive:
+                errors.append({'product_id': [f'El producto {pk} no está disponible.']})
+            elif pk in seen:
+                errors.append({'product_id': [f'El producto {pk} está repetido en el pedido.']})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return [
+            {'product': products[item_data['product_id']], **{k: v for k, v in item_data.items() if k != 'product_id'}}
+            for item_data in items_data
+        ]
+
+    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop('items')
-        order = Order.objects.create(total_amount=decimal.Decimal('0.00'), **validated_data) # Crea la Order sin total_amount, que se calculará después. 
-        for item_data in items_data:
-            # 'product_id' en item_data ya es un objeto Product gracias a PrimaryKeyRelatedField.
-            # No es necesario hacer un Product.objects.get() aquí.
-            product_instance = item_data.pop('product_id') # Extrae el objeto Product
-            OrderItem.objects.create(
-                order=order, # Asocia el item a la Order que acabamos de crear
-                product=product_instance, # Usa el objeto Product validado
-                **item_data # Resto de los datos del item (quantity)
-            )
+
+        # Construye los OrderItems en memoria tomando el precio vigente del producto.
+        # 'product' en item_data ya es la instancia resuelta en validate_items.
+        items = [
+            OrderItem(price_at_order=item_data['product'].price, **item_data)
+            for item_data in items_data
+        ]
+
+        # Reserva el stock de todas las líneas antes de registrar el pedido.
+        reserve_stock({item.product_id: item.quantity for item in items})
+
+        # El total se calcula una sola vez, antes de insertar nada.
+        total = sum((item.subtotal for item in items), decimal.Decimal('0.00'))
+        order = Order.objects.create(total_amount=total, **validated_data)
+
+        # Un único INSERT para todos los items. bulk_create no dispara post_save,
+        # por lo que la señal de recálculo del total no se ejecuta por cada línea.
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
         return order
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         items_data = validated_data.pop('items', []) # Usa .pop con default para no fallar si no hay items en el PUT/PATCH
 
-        instance.customer = validated_data.get('customer', instance.customer)
-        instance.status = validated_data.get('status', instance.status)
-        instance.save()
+        # Solo las columnas recibidas: total_amount lo mantiene la base de datos y un
+        # save() completo pisaría el total con el valor leído al cargar la orden.
+        fields = [field for field in ('customer', 'status') if field in validated_data]
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+        if fields:
+            instance.save(update_fields=fields)
 
         if items_data:
-            instance.items.all().delete() # Borra todos los items existentes
-            for item_data in items_data:
-                product_instance = item_data.pop('product_id')
-                OrderItem.objects.create(
-                    order=instance,
-                    product=product_instance,
-                    **item_data
-                )
-        
-        # Después de cualquier cambio en los OrderItems, el total de la Order
-        # se recalculará automáticamente gracias a las señales.
+            self.update_items(instance, items_data)
+
         instance.refresh_from_db() # Para que el objeto instance en memoria refleje el total actualizado
+        return instance
+
+    def update_items(self, order, items_data):
+        """
+        Aplica la lista de items recibida como diferencia contra la actual, emparejando
+        por producto: bulk_update de las cantidades que cambian, bulk_create de los
+        productos nuevos y un único DELETE de los que ya no vienen. Las líneas que se
+        mantienen conservan su id y su price_at_order; el total se recalcula una vez.
+        Los productos ya vienen resueltos y sin repetir desde validate_items.
+        """
+        incoming = {
+            item_data['product'].pk: (item_data['product'], item_data.get('quantity', 1))
+            for item_data in items_data
+        }
+
+        current = {item.product_id: item for item in order.items.all()}
+
+        # Ajusta el stock solo por la diferencia entre las cantidades nuevas y las anteriores.
+        deltas = {product_id: -item.quantity for product_id, item in current.items()}
+        for product_id, (_, quantity) in incoming.items():
+            deltas[product_id] = deltas.get(product_id, 0) + quantity
+        reserve_stock(deltas)
+
+        changed, created = [], []
+        for product_id, (product, quantity) in incoming.items():
+            item = current.get(product_id)
+            if item is None:
+                created.append(OrderItem(order=order, product=product, quantity=quantity, price_at_order=product.price))
+            elif item.quantity != quantity:
+                item.quantity = quantity
+                changed.append(item)
+        removed = [product_id for product_id in current if product_id not in incoming]
 
-        return instance
\ No newline at end of file
+        with defer_total_updates() as pending_totals:
+            if changed:
+                OrderItem.objects.bulk_update(changed, ['quantity'])
+            if created:
+                OrderItem.objects.bulk_create(created)
+            if removed:
+                order.items.filter(product_id__in=removed).delete()
+            if changed or created or removed:
+                pending_totals.add(order.pk)
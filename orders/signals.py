@@ -1,15 +1,57 @@
+import contextlib
+from contextvars import ContextVar
+
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import OrderItem, Order
 
+# Órdenes cuyo total se recalcula al salir de defer_total_updates(); None fuera del bloque.
+_deferred_orders = ContextVar('deferred_orders', default=None)
+
+
+@contextlib.contextmanager
+def defer_total_updates():
+    """
+    Posterga el recálculo de totales de las señales de OrderItem hasta el final del
+    bloque y lo hace con un solo UPDATE para todas las órdenes pendientes, salvo las
+    eliminadas dentro del bloque (ej. borrado en cascada de un cliente). Entrega el
+    conjunto de ids pendientes, al que se pueden agregar órdenes modificadas con
+    bulk_create/bulk_update (sin señales). Si el bloque lanza una excepción no se
+    recalcula nada.
+    """
+    pending = _deferred_orders.get()
+    if pending is not None:
+        # Bloque anidado: recalcula el más externo.
+        yield pending
+        return
+
+    pending = set()
+    token = _deferred_orders.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred_orders.reset(token)
+    if pending:
+        Order.recalculate_totals(sorted(pending))
+
 @receiver(post_delete, sender=OrderItem)
 @receiver(post_save, sender=OrderItem)
 def update_order_total(sender, instance, **kwargs):
     """
     Actualiza el total_amount del pedido cuando un OrderItem es guardado o eliminado.
     """
-    # Usamos try-except para manejar el caso en que la orden ya no exista (ej. CASCADE delete de la orden)
-    try:
-        instance.order.calculate_total_amount()
-    except Order.DoesNotExist:
-        pass # La orden ya fue eliminada, no hay nada que actualizar.
\ No newline at end of file
+    pending = _deferred_orders.get()
+    if pending is not None:
+        pending.add(instance.order_id)
+        return
+    # Un único UPDATE por order_id: no hace falta cargar la orden, y si ya fue
+    # eliminada (ej. CASCADE delete de la orden) simplemente no afecta filas.
+    Order.recalculate_total(instance.order_id)
+
+
+@receiver(post_delete, sender=Order)
+def forget_deleted_order(sender, instance, **kwargs):
+    """Una orden eliminada dentro de defer_total_updates() ya no necesita su total."""
+    pending = _deferred_orders.get()
+    if pending is not None:
+        pending.discard(instance.pk)
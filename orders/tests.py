@@ -1,13 +1,31 @@
+import csv
 import decimal # Importa el módulo decimal para manejar números con coma flotante de forma precisa
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor # Para las pruebas de concurrencia
+from unittest import mock
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from django.utils import timezone # Útil para manejar fechas y horas
+from django.utils.translation import gettext_lazy
+from django.db import connection
 from django.db.utils import IntegrityError # Para probar restricciones de unicidad
+from django.test.utils import CaptureQueriesContext # Para contar queries ejecutadas
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
 
 # Importa tus modelos de las apps correspondientes
 from customers.models import Customer
+from django_crud_api.parsers import FastJSONParser
+from django_crud_api.renderers import FastJSONRenderer
+from products.cache import get_catalog_version
 from products.models import Product
 from .models import Order, OrderItem
+from .serializers import OrderSerializer
 
 class OrderModelTest(TestCase):
     """
@@ -293,4 +311,757 @@ class OrderItemModelTest(TestCase):
         with self.assertRaises(IntegrityError):
             OrderItem.objects.create(
                 order=self.order, product=self.product_a, quantity=1, price_at_order=self.product_a.price
-            )
\ No newline at end of file
+            )
+
+class OrderSerializerCreateTest(TestCase):
+    """
+    Pruebas para la creación de pedidos a través de OrderSerializer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Luis', last_name='Rojas', email='luis.rojas@example.com'
+        )
+        cls.products = [
+            Product.objects.create(
+                name=f'Producto {i}', price=decimal.Decimal('10.50') + i, stock=100
+            )
+            for i in range(25)
+        ]
+
+    def _save_order(self, line_count):
+        """Valida y guarda un pedido con `line_count` líneas; devuelve (orden, queries de save)."""
+        data = {
+            'customer': self.customer.id,
+            'items': [
+                {'product_id': product.id, 'quantity': 2}
+                for product in self.products[:line_count]
+            ],
+        }
+        serializer = OrderSerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as ctx:
+            order = serializer.save()
+        return order, len(ctx.captured_queries)
+
+    def test_create_computes_total_and_snapshots_prices(self):
+        """El total y price_at_order quedan correctos tras la creación en bloque."""
+        order, _ = self._save_order(3)
+        order.refresh_from_db()
+
+        expected_total = sum(product.price * 2 for product in self.products[:3])
+        self.assertEqual(order.total_amount, expected_total)
+        self.assertEqual(order.items.count(), 3)
+        for item in order.items.all():
+            self.assertEqual(item.price_at_order, item.product.price)
+
+    def test_create_query_count_is_constant(self):
+        """La cantidad de queries al guardar no depende del número de líneas."""
+        _, queries_small = self._save_order(1)
+        _, queries_large = self._save_order(25)
+        self.assertEqual(queries_small, queries_large)
+
+
+class OrderSerializerUpdateTest(TestCase):
+    """
+    Pruebas de la actualización de items por diferencia en OrderSerializer.update.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Raúl', last_name='Vera', email='raul.vera@example.com'
+        )
+        cls.products = [
+            Product.objects.create(name=f'Producto {i}', price=decimal.Decimal('2.00') + i, stock=1000)
+            for i in range(30)
+        ]
+
+    def _save(self, lines, instance=None):
+        """Guarda el pedido con `lines` ({índice de producto: cantidad}); devuelve (orden, queries de save)."""
+        data = {
+            'customer': self.customer.id,
+            'items': [{'product_id': self.products[i].id, 'quantity': quantity} for i, quantity in lines.items()],
+        }
+        serializer = OrderSerializer(instance, data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as ctx:
+            order = serializer.save()
+        return order, ctx.captured_queries
+
+    def _items(self, order):
+        return {item.product_id: item for item in order.items.all()}
+
+    def test_update_does_not_overwrite_total_loaded_in_memory(self):
+        """Cambiar solo el cliente escribe customer_id; un total recalculado en paralelo se conserva."""
+        order, _ = self._save({0: 1})
+        stale = Order.objects.get(pk=order.pk)
+        OrderItem.objects.create(order=order, product=self.products[1], quantity=2) # recalcula el total (señal)
+
+        other = Customer.objects.create(first_name='Inés', last_name='Mora', email='ines.mora@example.com')
+        serializer = OrderSerializer(stale, data={'customer': other.id}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('total_amount', updates[0])
+        stale.refresh_from_db()
+        self.assertEqual((stale.customer_id, stale.total_amount), (other.id, decimal.Decimal('8.00')))
+
+    def test_unchanged_lines_keep_id_and_price(self):
+        """Las líneas que siguen en el pedido conservan su id y el precio del momento de la compra."""
+        order, _ = self._save({0: 1, 1: 1, 2: 1})
+        before = self._items(order)
+        Product.objects.filter(pk=self.products[0].pk).update(price=decimal.Decimal('99.00'))
+
+        order, _ = self._save({0: 1, 1: 5, 3: 2}, instance=order)
+        after = self._items(order)
+
+        self.assertEqual(set(after), {self.products[i].id for i in (0, 1, 3)})
+        for i in (0, 1):
+            product_id = self.products[i].id
+            self.assertEqual(after[product_id].id, before[product_id].id)
+            self.assertEqual(after[product_id].price_at_order, before[product_id].price_at_order)
+        self.assertEqual(after[self.products[1].id].quantity, 5)
+        self.assertEqual(after[self.products[3].id].price_at_order, self.products[3].price)
+        self.assertEqual(order.total_amount, sum(item.subtotal for item in after.values()))
+
+    def test_update_query_count_does_not_grow_with_lines(self):
+        """Cambiar, agregar y quitar líneas cuesta las mismas queries con 3 o con 30 líneas."""
+        small, _ = self._save({i: 1 for i in range(3)})
+        large, _ = self._save({i: 1 for i in range(25)})
+
+        _, queries_small = self._save({0: 2, 1: 1, 3: 1}, instance=small)
+        _, queries_large = self._save(
+            {**{i: 2 for i in range(10)}, **{i: 1 for i in range(10, 20)}, **{i: 1 for i in range(25, 30)}}, instance=large)
+
+        self.assertEqual(len(queries_small), len(queries_large))
+        deletes = [query['sql'] for query in queries_large if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+
+    def test_total_is_recalculated_once(self):
+        order, _ = self._save({i: 1 for i in range(10)})
+        _, queries = self._save({i: 3 for i in range(5)}, instance=order)
+        recalculations = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "orders_order" SET "total_amount"')]
+        self.assertEqual(len(recalculations), 1)
+
+    def test_repeated_product_is_rejected(self):
+        order, _ = self._save({0: 1})
+        data = {
+            'customer': self.customer.id,
+            'items': [{'product_id': self.products[1].id, 'quantity': 1}, {'product_id': self.products[1].id, 'quantity': 2}],
+        }
+        serializer = OrderSerializer(order, data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['items'][0], {})
+        self.assertIn('repetido', str(serializer.errors['items'][1]['product_id']))
+
+
+class OrderProductValidationTest(TestCase):
+    """
+    Pruebas de la resolución de productos en OrderSerializer.validate_items.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Tomás', last_name='Rey', email='tomas.rey@example.com'
+        )
+        cls.products = [
+            Product.objects.create(name=f'Producto {i}', price=decimal.Decimal('5.00'), stock=100)
+            for i in range(20)
+        ]
+        cls.inactive = Product.objects.create(name='Retirado', price=decimal.Decimal('5.00'), stock=10, is_active=False)
+
+    def _serializer(self, product_ids, instance=None):
+        data = {'customer': self.customer.id, 'items': [{'product_id': pk, 'quantity': 1} for pk in product_ids]}
+        return OrderSerializer(instance, data=data)
+
+    def test_products_are_resolved_in_one_query(self):
+        """Validar el pedido consulta los productos una sola vez, sin importar la cantidad de líneas."""
+        for count in (2, 20):
+            serializer = self._serializer([product.id for product in self.products[:count]])
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+            product_queries = [query['sql'] for query in ctx.captured_queries if 'products_product' in query['sql']]
+            self.assertEqual(len(product_queries), 1)
+
+    def test_resolved_product_is_used_for_price(self):
+        serializer = self._serializer([self.products[0].id])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        Product.objects.filter(pk=self.products[0].pk).update(price=decimal.Decimal('50.00'))
+        with CaptureQueriesContext(connection) as ctx:
+            order = serializer.save()
+        product_selects = [
+            query['sql'] for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT') and 'products_product' in query['sql']
+        ]
+        self.assertEqual(product_selects, [])
+        self.assertEqual(order.items.get().price_at_order, decimal.Decimal('5.00'))
+
+    def test_unknown_and_inactive_products_have_per_line_errors(self):
+        serializer = self._serializer([self.products[0].id, 999999, self.inactive.id])
+        self.assertFalse(serializer.is_valid())
+        errors = serializer.errors['items']
+        self.assertEqual(errors[0], {})
+        self.assertIn('999999', str(errors[1]['product_id']))
+        self.assertIn('no está disponible', str(errors[2]['product_id']))
+        self.assertFalse(Order.objects.exists())
+
+    def test_inactive_product_already_in_order_is_accepted_on_update(self):
+        """Un producto que se agotó con este mismo pedido no impide editarlo."""
+        product = Product.objects.create(name='Último', price=decimal.Decimal('5.00'), stock=1)
+        serializer = self._serializer([product.id])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        order = serializer.save()
+        product.refresh_from_db()
+        self.assertFalse(product.is_active)
+
+        serializer = self._serializer([product.id, self.products[0].id], instance=order)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer = self._serializer([self.inactive.id], instance=order)
+        self.assertFalse(serializer.is_valid())
+
+
+class OrderTotalRecalculationTest(TestCase):
+    """
+    Pruebas del recálculo de total_amount en la base de datos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Marta', last_name='Soto', email='marta.soto@example.com'
+        )
+        cls.product = Product.objects.create(name='Silla', price=decimal.Decimal('45.90'), stock=10)
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=self.customer, total_amount=decimal.Decimal('0.00'))
+
+    def test_recalculate_total_is_a_single_update(self):
+        """El recálculo es una sola sentencia UPDATE que solo escribe total_amount."""
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            Order.recalculate_total(self.order.id)
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        self.assertNotIn('"status"', sql.split('WHERE')[0])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_amount, decimal.Decimal('137.70'))
+
+    def test_calculate_total_amount_keeps_concurrent_changes(self):
+        """Recalcular el total no sobrescribe otros campos modificados en paralelo."""
+        stale_copy = Order.objects.get(pk=self.order.pk)
+        Order.objects.filter(pk=self.order.pk).update(status='shipped')
+
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1)
+        stale_copy.calculate_total_amount()
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'shipped')
+        self.assertEqual(stale_copy.total_amount, decimal.Decimal('45.90'))
+
+
+class OrderViewSetQueryTest(APITestCase):
+    """
+    Pruebas de eficiencia de queries en los endpoints de órdenes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='operador', password='clave-segura-123')
+        cls.customer = Customer.objects.create(
+            first_name='Pedro', last_name='Muñoz', email='pedro.munoz@example.com'
+        )
+        cls.products = [
+            Product.objects.create(name=f'Item {i}', price=decimal.Decimal('5.00'), stock=100)
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _create_orders(self, count, items_per_order):
+        for _ in range(count):
+            order = Order.objects.create(customer=self.customer, total_amount=decimal.Decimal('0.00'))
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price_at_order=product.price)
+                for product in self.products[:items_per_order]
+            ])
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_does_not_grow_with_orders(self):
+        """GET /api/orders/ ejecuta las mismas queries con 2 o con 10 órdenes."""
+        self._create_orders(2, 1)
+        queries_small = self._count_list_queries()
+
+        self._create_orders(8, 4)
+        queries_large = self._count_list_queries()
+
+        self.assertEqual(queries_small, queries_large)
+
+    def _updates(self, method, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url)
+        self.assertEqual(response.status_code, 204)
+        return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+
+    def test_destroy_does_not_recalculate_the_deleted_order(self):
+        """Los items borrados en cascada no recalculan el total de la orden que se elimina."""
+        self._create_orders(1, 4)
+        self.assertEqual(self._updates('delete', f'/api/orders/{Order.objects.get().pk}/'), [])
+
+    def test_product_destroy_recalculates_orders_once(self):
+        """Eliminar un producto recalcula todas sus órdenes con un solo UPDATE."""
+        self._create_orders(3, 2)
+        updates = self._updates('delete', f'/api/products/{self.products[0].pk}/')
+        self.assertEqual(len(updates), 1)
+        self.assertEqual({order.total_amount for order in Order.objects.all()}, {decimal.Decimal('5.00')})
+
+    def test_customer_destroy_does_not_recalculate_orders(self):
+        """Las órdenes de un cliente eliminado no se recalculan antes de borrarse."""
+        self._create_orders(3, 2)
+        Order.objects.update(status='delivered')
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self._updates('delete', f'/api/customers/{self.customer.pk}/'), [])
+        self.assertFalse(Order.objects.exists())
+
+    def test_writes_do_not_prefetch_items(self):
+        """PATCH carga la orden sin precargar sus items: solo se leen al renderizar la respuesta."""
+        self._create_orders(1, 4)
+        order = Order.objects.get()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(f'/api/orders/{order.pk}/?expand=items.product', {'customer': self.customer.pk})
+        self.assertEqual(response.status_code, 200)
+        item_queries = [q for q in ctx.captured_queries if 'FROM "orders_orderitem"' in q['sql']]
+        self.assertEqual(len(item_queries), 1)
+
+    def test_list_renders_nested_products(self):
+        """La precarga no altera la respuesta: los items incluyen el producto al expandirlo."""
+        self._create_orders(1, 2)
+        response = self.client.get('/api/orders/?expand=items.product')
+        item = response.data['results'][0]['items'][0]
+        self.assertEqual(item['product']['name'], 'Item 0')
+        self.assertEqual(item['price_at_order'], '5.00')
+
+    def test_expanded_list_query_count_does_not_grow_with_orders(self):
+        """Con ?expand=items.product el producto llega por JOIN, sin una query por item."""
+        self._create_orders(2, 1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/orders/?expand=items.product')
+        self._create_orders(8, 4)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/api/orders/?expand=items.product')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class OrderPaginationTest(APITestCase):
+    """
+    Paginación por cursor de GET /api/orders/, ordenada por (-order_date, -id).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='paginador', password='clave-segura-123')
+        customer = Customer.objects.create(first_name='Lía', last_name='Mora', email='lia.mora@example.com')
+        # Seis órdenes con la misma fecha (con microsegundos) y otras a pocos microsegundos de ella:
+        # un cursor que recorta la fecha salta filas de ambos grupos.
+        base = timezone.now().replace(microsecond=123456)
+        offsets = [0] * 6 + [1, 250, 999, -1, -400]
+        for offset in offsets:
+            order = Order.objects.create(customer=customer, total_amount=decimal.Decimal('0.00'))
+            Order.objects.filter(pk=order.pk).update(order_date=base + timezone.timedelta(microseconds=offset))
+        cls.expected_ids = list(Order.objects.order_by('-order_date', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_walks_all_pages_forward_and_back(self):
+        pages = []
+        url = '/api/orders/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([order['id'] for order in response.data['results']])
+            url = response.data['next']
+        self.assertEqual([pk for page in pages for pk in page], self.expected_ids)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([order['id'] for order in response.data['results']], pages[-2])
+
+
+class OrderSparseFieldsTest(APITestCase):
+    """
+    Pruebas de ?fields=, ?omit= y ?expand= sobre GET /api/orders/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='vendedor', password='clave-segura-123')
+        cls.customer = Customer.objects.create(
+            first_name='Luis', last_name='Mora', email='luis.mora@example.com'
+        )
+        cls.product = Product.objects.create(
+            name='Cuaderno', description='Descripción larga ' * 50, price=decimal.Decimal('3.00'), stock=10
+        )
+        cls.order = Order.objects.create(customer=cls.customer, total_amount=decimal.Decimal('6.00'))
+        OrderItem.objects.create(order=cls.order, product=cls.product, quantity=2, price_at_order=cls.product.price)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _get(self, query):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/orders/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0], [query['sql'] for query in ctx.captured_queries]
+
+    def test_product_is_an_id_unless_expanded(self):
+        order, _ = self._get('')
+        self.assertEqual(order['items'][0]['product'], self.product.id)
+
+        order, queries = self._get('?expand=items.product&fields=id,items.product.name')
+        self.assertEqual(order['items'][0]['product'], {'name': 'Cuaderno'})
+        self.assertNotIn('"description"', queries[-1])
+
+    def test_fields_skip_unrequested_relations(self):
+        """Sin 'items' en ?fields= no se consulta la tabla de items."""
+        order, queries = self._get('?fields=id,total_amount')
+        self.assertEqual(set(order), {'id', 'total_amount'})
+        self.assertFalse(any('orders_orderitem' in sql for sql in queries))
+
+    def test_nested_fields_and_omit(self):
+        order, queries = self._get('?fields=id,items.quantity')
+        self.assertEqual(order, {'id': self.order.id, 'items': [{'quantity': 2}]})
+        self.assertNotIn('"price_at_order"', queries[-1])
+
+        order, _ = self._get('?omit=status,items.price_at_order')
+        self.assertNotIn('status', order)
+        self.assertNotIn('price_at_order', order['items'][0])
+        self.assertIn('quantity', order['items'][0])
+
+    def test_write_requests_ignore_fields(self):
+        """En escrituras los parámetros no aplican: se valida y responde el serializador completo."""
+        response = self.client.post('/api/orders/?fields=id', {
+            'customer': self.customer.id,
+            'items': [{'product_id': self.product.id, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('total_amount', response.data)
+
+
+class OrderIndexTest(TestCase):
+    """
+    Verifica con EXPLAIN que los índices de pedidos se usan en las consultas frecuentes.
+    """
+
+    def test_pending_orders_by_customer_use_composite_index(self):
+        """La consulta de CustomerView.perform_destroy usa order_customer_status_idx."""
+        plan = Order.objects.filter(customer_id=1, status='pending').explain()
+        self.assertIn('order_customer_status_idx', plan)
+
+    def test_listing_order_uses_date_index(self):
+        """El listado paginado (-order_date, -id) recorre order_date_idx."""
+        plan = Order.objects.order_by('-order_date', '-id')[:10].explain()
+        self.assertIn('order_date_idx', plan)
+
+    def test_items_by_product_use_foreign_key_index(self):
+        """Los items de un producto se buscan por el índice de la clave foránea."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, OrderItem._meta.db_table)
+        index_name = next(
+            name for name, info in constraints.items()
+            if info['index'] and info['columns'] == ['product_id']
+        )
+        plan = OrderItem.objects.filter(product_id=1).explain()
+        self.assertIn(index_name, plan)
+
+
+class OrderStockReservationTest(TestCase):
+    """
+    Pruebas de la reserva de stock al crear y actualizar pedidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name='Iris', last_name='Paz', email='iris.paz@example.com'
+        )
+
+    def setUp(self):
+        self.mug = Product.objects.create(name='Taza', price=decimal.Decimal('3.00'), stock=4)
+        self.pen = Product.objects.create(name='Lápiz', price=decimal.Decimal('1.00'), stock=1)
+
+    def _serializer(self, items, instance=None):
+        data = {'customer': self.customer.id, 'items': items}
+        serializer = OrderSerializer(instance, data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer
+
+    def test_create_reserves_stock(self):
+        """Crear un pedido descuenta el stock y desactiva el producto que llega a 0."""
+        self._serializer([
+            {'product_id': self.mug.id, 'quantity': 3},
+            {'product_id': self.pen.id, 'quantity': 1},
+        ]).save()
+
+        self.mug.refresh_from_db()
+        self.pen.refresh_from_db()
+        self.assertEqual(self.mug.stock, 1)
+        self.assertEqual((self.pen.stock, self.pen.is_active), (0, False))
+
+    def test_create_without_stock_is_rejected_atomically(self):
+        """Si una línea no tiene stock no se crea el pedido ni se toca ningún stock."""
+        serializer = self._serializer([
+            {'product_id': self.mug.id, 'quantity': 2},
+            {'product_id': self.pen.id, 'quantity': 5},
+        ])
+        with self.assertRaises(ValidationError) as ctx:
+            serializer.save()
+
+        self.assertIn(str(self.pen.id), str(ctx.exception.detail))
+        self.assertFalse(Order.objects.exists())
+        self.mug.refresh_from_db()
+        self.assertEqual(self.mug.stock, 4)
+
+    def test_update_adjusts_stock_by_difference(self):
+        """Actualizar las líneas solo descuenta o devuelve la diferencia de cantidades."""
+        order = self._serializer([{'product_id': self.mug.id, 'quantity': 3}]).save()
+        self._serializer([{'product_id': self.mug.id, 'quantity': 1}], instance=order).save()
+
+        self.mug.refresh_from_db()
+        self.assertEqual(self.mug.stock, 3)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class OrderStockConcurrencyTest(TransactionTestCase):
+    """
+    Pedidos concurrentes desde varios hilos contra la base de datos real: el stock
+    nunca se vende de más. Requiere bloqueo por fila (ej. MySQL/InnoDB); SQLite
+    bloquea la tabla completa y rechaza las transacciones concurrentes.
+    """
+
+    def test_concurrent_orders_do_not_oversell(self):
+        customer = Customer.objects.create(first_name='Hilo', last_name='Uno', email='hilo@example.com')
+        product = Product.objects.create(name='Edición limitada', price=decimal.Decimal('50.00'), stock=5)
+
+        def place_order():
+            serializer = OrderSerializer(data={
+                'customer': customer.id,
+                'items': [{'product_id': product.id, 'quantity': 1}],
+            })
+            try:
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = [future.result() for future in [executor.submit(place_order) for _ in range(20)]]
+
+        product.refresh_from_db()
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(product.stock, 0)
+        self.assertEqual(Order.objects.count(), 5)
+
+
+class OrderExportTest(APITestCase):
+    """
+    Pruebas de la exportación en streaming GET /api/orders/export/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='contable', password='clave-segura-123')
+        cls.customer = Customer.objects.create(
+            first_name='Sara', last_name='Lagos', email='sara.lagos@example.com'
+        )
+        cls.product = Product.objects.create(name='Libro, tapa dura', price=decimal.Decimal('12.00'), stock=100)
+        cls.orders = []
+        for i in range(5):
+            order = Order.objects.create(customer=cls.customer, total_amount=decimal.Decimal('24.00'))
+            if i != 4: # la última orden queda sin items
+                OrderItem.objects.create(order=order, product=cls.product, quantity=2, price_at_order=cls.product.price)
+            cls.orders.append(order)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_ndjson_export(self):
+        """Cada línea es una orden completa con sus items."""
+        response = self.client.get('/api/orders/export/')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [order.id for order in self.orders])
+        self.assertEqual(lines[0]['items'][0]['price_at_order'], '12.00')
+        self.assertEqual(lines[0]['items'][0]['product_name'], 'Libro, tapa dura')
+        self.assertEqual(lines[-1]['items'], [])
+
+    def test_csv_export(self):
+        """Una fila por item más el encabezado; las comas en nombres se escapan."""
+        response = self.client.get('/api/orders/export/?type=csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][0], 'order_id')
+        self.assertEqual(len(rows), 1 + 5)
+        self.assertEqual(rows[1][7], 'Libro, tapa dura')
+
+    def test_export_reads_in_constant_size_chunks(self):
+        """Cada bloque usa las mismas queries sin importar cuántas órdenes haya en total."""
+        with self.settings(ORDER_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/api/orders/export/')
+            with CaptureQueriesContext(connection) as ctx:
+                b''.join(response.streaming_content)
+        # 3 bloques con datos (órdenes + items) y una consulta final vacía.
+        self.assertEqual(len(ctx.captured_queries), 3 * 2 + 1)
+
+    def test_rejects_unknown_format(self):
+        self.assertEqual(self.client.get('/api/orders/export/?type=xml').status_code, 400)
+
+
+class OrderFastListTest(APITestCase):
+    """
+    Prueba diferencial del camino rápido (API_FAST_LIST): GET /api/orders/ debe
+    devolver exactamente los mismos bytes que el serializador normal.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auditor', password='clave-segura-123')
+        customer = Customer.objects.create(first_name='Rosa', last_name='Vidal', email='rosa.vidal@example.com')
+        products = [
+            Product.objects.create(name='Taza', price=decimal.Decimal('4.50'), stock=50),
+            Product.objects.create(name='Plato', description='Cerámica', price=decimal.Decimal('1234.05'), stock=50),
+        ]
+        for i in range(5):
+            order = Order.objects.create(customer=customer, total_amount=decimal.Decimal('0.00'), status='pending' if i % 2 else 'shipped')
+            for product in products[:i % 3]:
+                OrderItem.objects.create(order=order, product=product, quantity=i + 1, price_at_order=product.price)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _get(self, url, fast):
+        with self.settings(API_FAST_LIST=fast):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_same_output_as_serializer(self):
+        for query in ['', '?expand=items.product', '?fields=id,items.quantity', '?omit=items,order_date', '?page_size=2']:
+            with self.subTest(query=query):
+                url = f'/api/orders/{query}'
+                self.assertEqual(self._get(url, fast=True), self._get(url, fast=False))
+
+    def test_same_cursor_pages(self):
+        url = '/api/orders/?page_size=2'
+        while url:
+            content = self._get(url, fast=True)
+            self.assertEqual(content, self._get(url, fast=False))
+            url = json.loads(content)['next']
+
+    def test_fast_path_queries(self):
+        """Una query para las órdenes y otra para todos sus items."""
+        with self.settings(API_FAST_LIST=True), CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/orders/?expand=items.product')
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+
+class FastJSONRendererTest(TestCase):
+    """
+    FastJSONRenderer / FastJSONParser deben producir lo mismo que el JSON estándar de DRF
+    (en floats, el mismo valor).
+    """
+
+    def _payload(self):
+        return {
+            'id': 1,
+            'order_date': timezone.now(),
+            'total_amount': decimal.Decimal('1234.50'),
+            'status': gettext_lazy('pending'),
+            'note': 'línea\u2028separada\u2029 "comillas" ñ',
+            'items': [{'price_at_order': '0.10', 'quantity': 3, 'product': None}],
+        }
+
+    def test_same_bytes_as_json_renderer(self):
+        data = self._payload()
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_falls_back_for_indent_and_big_integers(self):
+        data = {'big': 2 ** 70, 'nested': self._payload()}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+        indented = FastJSONRenderer().render(data, 'application/json; indent=4')
+        self.assertEqual(indented, JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_floats_keep_their_value(self):
+        """Los floats pueden cambiar de texto (1e-05 frente a 1e-5), nunca de valor."""
+        data = {'relevance': [1e-05, 1e16, 0.1, 2.0, -3.75e-300]}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_without_orjson(self):
+        data = self._payload()
+        with mock.patch('django_crud_api.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_matches_json_parser(self):
+        body = json.dumps({'customer': 1, 'items': [{'product_id': 2, 'quantity': 3}], 'nota': 'ñ'}).encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            FastJSONParser().parse(io.BytesIO(b'{"customer": '))
+
+
+class SeedDataCommandTest(TestCase):
+    """
+    Pruebas del comando seed_data.
+    """
+
+    def seed(self, **options):
+        call_command('seed_data', customers=30, products=20, orders=40, batch_size=7, stdout=io.StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(Customer.objects.order_by('pk').values_list('first_name', 'last_name', 'email', 'city')),
+            list(Product.objects.order_by('pk').values_list('name', 'price', 'stock', 'is_active')),
+            list(Order.objects.order_by('pk').values_list('status', 'total_amount')),
+            OrderItem.objects.count(),
+        )
+
+    def test_creates_requested_volumes_with_consistent_totals(self):
+        self.seed(max_items_per_order=3)
+        self.assertEqual((Customer.objects.count(), Product.objects.count(), Order.objects.count()), (30, 20, 40))
+        for order in Order.objects.prefetch_related('items'):
+            items = order.items.all()
+            self.assertTrue(1 <= len(items) <= 3)
+            self.assertEqual(order.total_amount, sum(item.price_at_order * item.quantity for item in items))
+
+    def test_invalidates_cached_catalog(self):
+        """Los productos se insertan con bulk_create: el comando debe cambiar la versión del catálogo."""
+        before = get_catalog_version()
+        self.seed()
+        self.assertNotEqual(get_catalog_version(), before)
+
+    def test_same_seed_generates_same_data(self):
+        self.seed(seed=7)
+        first = self.snapshot()
+        for model in (OrderItem, Order, Customer, Product):
+            model.objects.all().delete()
+        self.seed(seed=7)
+        self.assertEqual(self.snapshot(), first)
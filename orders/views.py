@@ -1,18 +1,29 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets
-from drf_spectacular.utils import extend_schema_view, extend_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
+from django_crud_api.mixins import FastListMixin, OptimizedQuerysetMixin, PrimaryDatabaseWritesMixin
+from django_crud_api.serializers import DYNAMIC_FIELDS_PARAMETERS
+from .exports import EXPORT_CONTENT_TYPES, EXPORT_STREAMS, iter_orders
 from .models import Order
 from .serializers import OrderSerializer
+from .signals import defer_total_updates
 from rest_framework.permissions import IsAuthenticated
 
 @extend_schema_view(
     list=extend_schema(
         summary="Listar órdenes",
         description="Devuelve todas las órdenes registradas, con datos de cliente y productos.",
+        parameters=DYNAMIC_FIELDS_PARAMETERS,
         tags=["Orders"]
     ),
     retrieve=extend_schema(
         summary="Obtener orden",
         description="Devuelve una orden específica por ID, incluyendo cliente y productos relacionados.",
+        parameters=DYNAMIC_FIELDS_PARAMETERS,
         tags=["Orders"]
     ),
     create=extend_schema(
@@ -36,7 +47,35 @@ from rest_framework.permissions import IsAuthenticated
         tags=["Orders"]
     ),
 )
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(PrimaryDatabaseWritesMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+    # Órdenes más recientes primero; 'id' desempata pedidos del mismo instante.
+    ordering = ('-order_date', '-id')
+
+    def perform_destroy(self, instance):
+        # Los items se eliminan en cascada sin recalcular el total de la orden que se borra.
+        with defer_total_updates():
+            instance.delete()
+
+    @extend_schema(
+        summary="Exportar órdenes",
+        description=(
+            "Exporta todas las órdenes con sus items como NDJSON (una orden por línea) o CSV "
+            "(una fila por item). La respuesta se genera en streaming, por bloques de órdenes."
+        ),
+        parameters=[OpenApiParameter('type', str, enum=list(EXPORT_CONTENT_TYPES), description="Formato de salida (por defecto ndjson).")],
+        responses={(200, content_type): OpenApiTypes.STR for content_type in EXPORT_CONTENT_TYPES.values()},
+        tags=["Orders"]
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def export(self, request):
+        file_format = request.query_params.get('type', 'ndjson')
+        if file_format not in EXPORT_STREAMS:
+            raise ValidationError({"type": "Formato no soportado. Use ndjson o csv."})
+
+        orders = iter_orders(self.filter_queryset(Order.objects.all()), settings.ORDER_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(EXPORT_STREAMS[file_format](orders), content_type=EXPORT_CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="orders.{file_format}"'
+        return response
@@ -0,0 +1,105 @@
+import contextlib
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+from django_crud_api.db_routers import use_primary
+
+CATALOG_VERSION_KEY = 'products:catalog_version'
+
+
+def get_catalog_cache():
+    return caches[settings.PRODUCT_CACHE_ALIAS]
+
+
+def get_catalog_version():
+    """Versión actual del catálogo; forma parte de todas las claves cacheadas."""
+    cache = get_catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Si la versión no existe (o fue desalojada) se inicia con un valor basado en
+        # el tiempo, para no volver nunca a las claves de una versión anterior.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def _increment_version():
+    cache = get_catalog_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_catalog_version():
+    """
+    Invalida todas las respuestas cacheadas del catálogo.
+    Debe llamarse después de cualquier escritura sobre Product, incluidas las que
+    no disparan señales (update(), bulk_create(), bulk_update()).
+    """
+    _increment_version()
+    if connection.in_atomic_block:
+        # Se vuelve a invalidar al confirmar la transacción, para descartar lo que
+        # otras peticiones hayan cacheado entre la escritura y el commit.
+        transaction.on_commit(_increment_version)
+
+
+class CatalogCacheMixin:
+    """
+    Caché read-through para las acciones públicas de lectura del catálogo.
+    La clave incluye la URL completa (filtros, cursor, host) y la versión del
+    catálogo, por lo que cualquier escritura invalida todo sin esperar un TTL.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cached_actions:
+            return handler(request, *args, **kwargs)
+
+        cache = get_catalog_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        with self.fill_database():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.PRODUCT_CACHE_TIMEOUT)
+        return response
+
+    def cached_value(self, request, name, compute):
+        """Cachea un valor derivado de la petición (ej. validadores HTTP) con la misma versión."""
+        cache = get_catalog_cache()
+        key = self.get_cache_key(request, name)
+        value = cache.get(key)
+        if value is None:
+            with self.fill_database():
+                value = compute(request)
+            cache.set(key, value, settings.PRODUCT_CACHE_TIMEOUT)
+        return value
+
+    def fill_database(self):
+        """
+        Las entradas se calculan desde el primario: una réplica con retraso guardaría
+        filas anteriores a la última escritura bajo la versión nueva del catálogo, y
+        se servirían hasta que venza PRODUCT_CACHE_TIMEOUT. Con timeout 0 no se
+        guarda nada y la lectura puede ir a la réplica asignada.
+        """
+        return contextlib.nullcontext() if settings.PRODUCT_CACHE_TIMEOUT == 0 else use_primary()
+
+    def get_cache_key(self, request, name='response'):
+        raw = f'{name}:{self.action}:{request.build_absolute_uri()}'
+        digest = hashlib.sha256(raw.encode()).hexdigest()
+        return f'products:{get_catalog_version()}:{digest}'
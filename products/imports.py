@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from .cache import bump_catalog_version
+from .models import Product
+from .serializers import ProductSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Columnas que se pueden sobrescribir cuando la fila trae el id de un producto existente.
+UPSERT_FIELDS = ['name', 'description', 'price', 'stock', 'is_active', 'updated_at']
+
+
+def detect_format(uploaded_file, requested=None):
+    """Determina el formato desde ?type= o, si no se indica, desde la extensión del archivo."""
+    if requested:
+        return requested if requested in IMPORT_FORMATS else None
+    name = (uploaded_file.name or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+
+def read_rows(uploaded_file, file_format):
+    """
+    Itera (número de línea, fila) leyendo el archivo de forma incremental.
+    Las celdas vacías del CSV se omiten: en un producto nuevo aplican los valores por
+    defecto y en uno existente se conserva el valor actual.
+    """
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        # La línea 1 es el encabezado.
+        for number, row in enumerate(csv.DictReader(text), start=2):
+            yield number, {key: value for key, value in row.items() if key and value not in ('', None)}
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+class ProductImporter:
+    """
+    Importa productos en lotes: valida cada fila con las reglas de ProductSerializer
+    y escribe cada lote con bulk_create(update_conflicts=True), que inserta las filas
+    nuevas y actualiza las que traen el id de un producto existente.
+
+    Al actualizar solo se escriben las columnas que la fila trae (una celda vacía del
+    CSV o una clave ausente del NDJSON conserva el valor actual): un bulk_create por
+    cada combinación de columnas del lote, normalmente uno solo. Un stock de 0 (o un
+    producto nuevo sin stock) deja el producto inactivo; un stock positivo no
+    reactiva un producto retirado si la fila no trae is_active, y una fila con id y
+    sin stock aplica su is_active tal cual.
+
+    `imported` cuenta las filas válidas. Si un id se repite dentro de un lote, se
+    aplica la última fila, pero todas cuentan.
+
+    La memoria usada depende del tamaño del lote, no del archivo: solo se retiene el
+    lote en curso y, como máximo, `max_errors` errores detallados.
+    """
+
+    def __init__(self, batch_size, max_errors):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        # Una sola instancia: los campos del serializador se construyen una vez.
+        self.serializer = ProductSerializer()
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch, batch_rows = {}, 0
+        try:
+            for number, row in rows:
+                built = self.build_product(number, row)
+                if built is None:
+                    continue
+                product, fields = built
+                # Un id repetido dentro del mismo lote se queda con la última fila.
+                batch[product.pk if product.pk is not None else ('new', number)] = (product, fields)
+                batch_rows += 1
+                if len(batch) >= self.batch_size:
+                    self.write(batch.values(), batch_rows)
+                    batch, batch_rows = {}, 0
+            if batch:
+                self.write(batch.values(), batch_rows)
+        finally:
+            if self.imported:
+                bump_catalog_version()
+        return {'imported': self.imported, 'error_count': self.error_count, 'errors': self.errors}
+
+    def build_product(self, number, row):
+        if not isinstance(row, dict):
+            self.add_error(number, {'non_field_errors': ['La línea no contiene un objeto JSON válido.']})
+            return None
+
+        row = dict(row)
+        pk = row.pop('id', None)
+        try:
+            pk = int(pk) if pk not in (None, '') else None
+        except (TypeError, ValueError):
+            self.add_error(number, {'id': ['Debe ser un número entero.']})
+            return None
+
+        try:
+            data = self.serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            self.add_error(number, exc.detail)
+            return None
+
+        # Columnas que la fila trae: las únicas que se sobrescriben en un producto existente.
+        fields = {field for field in UPSERT_FIELDS if field in data}
+        fields.add('updated_at')
+
+        # Mismas reglas que ProductViewSet.perform_create, solo si la fila trae stock o crea
+        # un producto: una fila con id y sin stock no toca stock ni el is_active que envía.
+        if 'stock' in data or pk is None:
+            stock = data.get('stock', 0)
+            if stock < 0:
+                self.add_error(number, {'stock': ['El stock inicial no puede ser negativo.']})
+                return None
+            if stock == 0:
+                data['is_active'] = False
+                fields.add('is_active')
+        return Product(pk=pk, **data), frozenset(fields)
+
+    def write(self, batch, batch_rows):
+        unique_fields = ['id'] if connection.features.supports_update_conflicts_with_target else None
+        # Las filas sin id no chocan con ninguna existente: van juntas, sin importar sus columnas.
+        groups = {}
+        for product, fields in batch:
+            groups.setdefault(fields if product.pk is not None else None, []).append(product)
+        with transaction.atomic():
+            for fields, products in groups.items():
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    update_fields=[field for field in UPSERT_FIELDS if fields is None or field in fields],
+                    unique_fields=unique_fields,
+                )
+        self.imported += batch_rows
+
+    def add_error(self, number, detail):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': number, 'errors': detail})
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Índice de búsqueda de texto sobre name y description (ver products/search.py).
+# Django no tiene índices FULLTEXT ni FTS5, por eso se crean con SQL según el motor;
+# en los demás motores la búsqueda usa icontains y la migración no hace nada.
+#
+# En SQLite la tabla FTS5 se mantiene con triggers sobre products_product. Si una
+# migración futura reconstruye esa tabla (SQLite lo hace en muchos AlterField),
+# los triggers se pierden y deben volver a crearse en la misma migración.
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE products_product_fts USING fts5("
+    "name, description, content='products_product', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER products_product_fts_insert AFTER INSERT ON products_product BEGIN "
+    "INSERT INTO products_product_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER products_product_fts_delete AFTER DELETE ON products_product BEGIN "
+    "INSERT INTO products_product_fts (products_product_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "END",
+    # Solo cuando cambia el texto: los UPDATE de stock no tocan el índice.
+    "CREATE TRIGGER products_product_fts_update AFTER UPDATE OF name, description ON products_product BEGIN "
+    "INSERT INTO products_product_fts (products_product_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_product_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+    "INSERT INTO products_product_fts (products_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS products_product_fts_insert",
+    "DROP TRIGGER IF EXISTS products_product_fts_delete",
+    "DROP TRIGGER IF EXISTS products_product_fts_update",
+    "DROP TABLE IF EXISTS products_product_fts",
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX product_search_idx ON products_product (name, description)'
+        )
+    elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX product_search_idx ON products_product')
+    elif connection.vendor == 'sqlite':
+        for sql in SQLITE_BACKWARD:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_add_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# MySQL: índices FULLTEXT por columna para ponderar la relevancia (el nombre pesa el
+# doble que la descripción, ver products/search.py). MATCH() exige un índice con
+# exactamente sus columnas; product_search_idx (name, description) sigue resolviendo
+# el WHERE. En los demás motores no hace nada.
+
+
+def create_column_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('CREATE FULLTEXT INDEX product_name_search_idx ON products_product (name)')
+        schema_editor.execute('CREATE FULLTEXT INDEX product_description_search_idx ON products_product (description)')
+
+
+def drop_column_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX product_name_search_idx ON products_product')
+        schema_editor.execute('DROP INDEX product_description_search_idx ON products_product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_column_indexes, drop_column_indexes),
+    ]
@@ -1,4 +1,97 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+
+
+class InsufficientStock(Exception):
+    """Uno o más productos no tienen stock suficiente; `product_ids` indica cuáles."""
+
+    def __init__(self, product_ids=()):
+        super().__init__(product_ids)
+        self.product_ids = list(product_ids)
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    Operaciones de stock atómicas: cada una es un único UPDATE condicional con
+    expresiones F(), sin leer el stock antes (sin read-modify-write).
+
+    En los UPDATE, is_active se asigna antes que stock: MySQL evalúa el SET de
+    izquierda a derecha, y así la condición sobre stock ve el valor previo en
+    todos los motores. updated_at se asigna a mano porque update() no aplica auto_now.
+    """
+
+    def increase_stock(self, amount):
+        """Suma `amount` al stock; reactiva los productos que pasan de 0 a positivo."""
+        updated = self.update(
+            is_active=Case(
+                When(stock__lte=0, stock__gt=-amount, then=Value(True)),
+                default=F('is_active'),
+            ),
+            stock=F('stock') + amount,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            bump_catalog_version()
+        return updated
+
+    def mark_sold_out(self):
+        """Desactiva los productos sin stock; devuelve la cantidad de filas afectadas."""
+        updated = self.filter(stock__lte=0).update(is_active=False, updated_at=timezone.now())
+        if updated:
+            bump_catalog_version()
+        return updated
+
+    def apply_stock_deltas(self, deltas):
+        """
+        Aplica {product_id: cantidad} con un único UPDATE: las cantidades positivas se
+        descuentan solo si hay stock suficiente y las negativas lo devuelven. Un producto
+        que llega a 0 queda inactivo, igual que en ProductViewSet.perform_update.
+
+        Si algún producto no alcanza se revierte todo y se lanza InsufficientStock.
+        El UPDATE recorre las filas por clave primaria, por lo que pedidos concurrentes
+        las bloquean siempre en el mismo orden y no se producen deadlocks. Todo, incluida
+        la consulta de faltantes, se hace en la base de escritura: una réplica con
+        retraso informaría un stock que ya no es el real.
+        """
+        deltas = {pk: quantity for pk, quantity in deltas.items() if quantity}
+        if not deltas:
+            return
+
+        db = router.db_for_write(self.model)
+        queryset = self.using(db)
+
+        condition = Q()
+        new_stock, new_active = [], []
+        for pk, quantity in sorted(deltas.items()):
+            if quantity > 0:
+                condition |= Q(pk=pk, stock__gte=quantity)
+                new_active.append(When(pk=pk, stock=quantity, then=Value(False)))
+            else:
+                condition |= Q(pk=pk)
+                new_active.append(When(pk=pk, stock__lte=0, stock__gt=quantity, then=Value(True)))
+            new_stock.append(When(pk=pk, then=F('stock') - quantity))
+
+        try:
+            with transaction.atomic(using=db):
+                updated = queryset.filter(condition).update(
+                    is_active=Case(*new_active, default=F('is_active')),
+                    stock=Case(*new_stock, default=F('stock')),
+                    updated_at=timezone.now(),
+                )
+                if updated != len(deltas):
+                    raise InsufficientStock()
+        except InsufficientStock:
+            # Solo en el caso de error: se consulta qué productos no alcanzaron.
+            available = dict(queryset.filter(pk__in=deltas).values_list('pk', 'stock'))
+            raise InsufficientStock(
+                pk for pk, quantity in sorted(deltas.items())
+                if quantity > 0 and available.get(pk, 0) < quantity
+            )
+        bump_catalog_version()
+
 
 class Product(models.Model):
     name = models.CharField(max_length=200)
@@ -9,5 +102,13 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listados filtrados por visibilidad y paginados por id.
+            models.Index(fields=['is_active', 'id'], name='product_active_idx'),
+        ]
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
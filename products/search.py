@@ -0,0 +1,133 @@
+import contextlib
+import functools
+import re
+import sqlite3
+
+from django.db import connections, router
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Product
+
+# Tabla FTS5 de SQLite que crea la migración 0003 (en MySQL, los índices FULLTEXT de 0003 y 0004).
+FTS_TABLE = 'products_product_fts'
+
+MAX_TERMS = 10
+_TERM = re.compile(r'\w+')
+
+
+def parse_terms(text):
+    """Palabras de la búsqueda en minúsculas, sin operadores ni repetidas (como máximo MAX_TERMS)."""
+    terms = []
+    for term in _TERM.findall(text.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+class MySQLFullTextSearch:
+    """
+    MATCH ... AGAINST en modo de lenguaje natural: basta con que aparezca uno de
+    los términos. El índice FULLTEXT (name, description) resuelve el WHERE y la
+    relevancia es 2 * MATCH(name) + MATCH(description), con los índices por
+    columna de la migración 0004, para que el nombre pese el doble que la
+    descripción como en los demás motores. Los términos más cortos que
+    innodb_ft_min_token_size (3 por defecto) o que son stopwords no se indexan.
+    """
+    name = 'fulltext'
+
+    def rank(self, connection, terms, is_active, limit):
+        table = connection.ops.quote_name(Product._meta.db_table)
+        against = 'AGAINST (%s IN NATURAL LANGUAGE MODE)'
+        query = ' '.join(terms)
+        sql = (
+            f'SELECT id, 2 * MATCH (name) {against} + MATCH (description) {against} AS relevance '
+            f'FROM {table} WHERE MATCH (name, description) {against}'
+        )
+        params = [query, query, query]
+        if is_active is not None:
+            sql += ' AND is_active = %s'
+            params.append(is_active)
+        sql += ' ORDER BY relevance DESC, id LIMIT %s'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return [(pk, float(relevance)) for pk, relevance in cursor.fetchall()]
+
+
+class SQLiteFullTextSearch:
+    """
+    Tabla FTS5 con el contenido de products_product (la mantienen triggers, así
+    que también ve bulk_create y update()). Los términos se combinan con OR y la
+    relevancia es -bm25, con el nombre pesando el doble que la descripción.
+    """
+    name = 'fts5'
+
+    def rank(self, connection, terms, is_active, limit):
+        table = connection.ops.quote_name(Product._meta.db_table)
+        sql = (
+            f'SELECT {FTS_TABLE}.rowid, -bm25({FTS_TABLE}, 2.0, 1.0) AS relevance '
+            f'FROM {FTS_TABLE} JOIN {table} ON {table}.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        # Cada término entre comillas: FTS5 no interpreta nada de lo que escribió el cliente.
+        params = [' OR '.join(f'"{term}"' for term in terms)]
+        if is_active is not None:
+            sql += f' AND {table}.is_active = %s'
+            params.append(is_active)
+        sql += f' ORDER BY relevance DESC, {FTS_TABLE}.rowid LIMIT %s'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall()
+
+
+class ContainsSearch:
+    """
+    Respaldo para cualquier motor: icontains sobre name y description, con 2
+    puntos por término en el nombre y 1 en la descripción. Recorre la tabla
+    completa; sirve como referencia en benchmarks/bench_product_search.py.
+    """
+    name = 'icontains'
+
+    def rank(self, connection, terms, is_active, limit):
+        condition = Q()
+        relevance = Value(0)
+        for term in terms:
+            condition |= Q(name__icontains=term) | Q(description__icontains=term)
+            relevance += Case(When(name__icontains=term, then=Value(2)), default=Value(0), output_field=IntegerField())
+            relevance += Case(When(description__icontains=term, then=Value(1)), default=Value(0), output_field=IntegerField())
+        queryset = Product.objects.using(connection.alias).filter(condition)
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active)
+        queryset = queryset.annotate(relevance=relevance).order_by('-relevance', 'id')
+        return [(pk, float(relevance)) for pk, relevance in queryset.values_list('id', 'relevance')[:limit]]
+
+
+@functools.cache
+def sqlite_has_fts5():
+    """
+    Si el SQLite de Python incluye FTS5: la misma condición con la que la migración
+    0003 crea la tabla. Se consulta en una base en memoria para no agregar una query
+    a la conexión de la petición.
+    """
+    with contextlib.closing(sqlite3.connect(':memory:')) as db:
+        return bool(db.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def get_search_backend(connection):
+    if connection.vendor == 'mysql':
+        return MySQLFullTextSearch()
+    if connection.vendor == 'sqlite' and sqlite_has_fts5():
+        return SQLiteFullTextSearch()
+    return ContainsSearch()
+
+
+def search_products(text, is_active=None, limit=20, using=None, backend=None):
+    """
+    [(id, relevancia)] de los productos cuyo nombre o descripción contiene alguna
+    palabra de `text`, del más relevante al menos (a igual relevancia, por id).
+    """
+    terms = parse_terms(text)
+    if not terms:
+        return []
+    connection = connections[using or router.db_for_read(Product)]
+    backend = backend or get_search_backend(connection)
+    return backend.rank(connection, terms, is_active, limit)
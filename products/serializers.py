@@ -1,9 +1,28 @@
 # products/serializers.py
 from rest_framework import serializers
+from django_crud_api.serializers import DynamicFieldsMixin
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['created_at', 'updated_at']
+
+
+class StockIncreaseSerializer(serializers.Serializer):
+    amount = serializers.IntegerField(min_value=1)
+
+
+class ProductSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, help_text="Palabras a buscar en el nombre y la descripción.")
+    is_active = serializers.BooleanField(
+        required=False, allow_null=True, default=None,
+        help_text="Solo productos activos (true) o inactivos (false); sin indicar, todos.")
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, default=20, help_text="Cantidad máxima de resultados.")
+
+
+class ProductSearchResultSerializer(ProductSerializer):
+    # Puntaje del motor de búsqueda: solo sirve para comparar resultados de la misma búsqueda.
+    relevance = serializers.FloatField(read_only=True)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import bump_catalog_version
+from .models import Product
+
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Product)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """
+    Invalida la caché del catálogo cuando un Product es guardado o eliminado.
+    """
+    bump_catalog_version()
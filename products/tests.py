@@ -1,9 +1,21 @@
 import decimal # Para trabajar con DecimalField de forma precisa
-from django.test import TestCase
+import json
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor # Para las pruebas de concurrencia
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone # Aunque auto_now_add/auto_now lo manejan, es bueno saberlo
+from unittest import mock
 import time # Para manejar el tiempo de creación y actualización
 
-from .models import Product
+from rest_framework.test import APITestCase
+
+from .cache import get_catalog_cache
+from .models import InsufficientStock, Product
+from .search import ContainsSearch, MySQLFullTextSearch, get_search_backend, parse_terms, search_products
 
 class ProductModelTest(TestCase):
     """
@@ -135,4 +147,511 @@ class ProductModelTest(TestCase):
 
         # Verificar que el producto ya no existe
         self.assertFalse(Product.objects.filter(id=product_to_delete.id).exists())
-        self.assertEqual(Product.objects.count(), 1) # Solo queda el self.product del setUp
\ No newline at end of file
+        self.assertEqual(Product.objects.count(), 1) # Solo queda el self.product del setUp
+
+class ProductIndexTest(TestCase):
+    """
+    Verifica con EXPLAIN que el índice (is_active, id) se usa.
+    """
+
+    def test_active_products_use_active_index(self):
+        """Los ids de productos activos se resuelven desde product_active_idx."""
+        plan = Product.objects.filter(is_active=True).values_list('id', flat=True).explain()
+        self.assertIn('product_active_idx', plan)
+
+
+class ProductCacheTest(APITestCase):
+    """
+    Pruebas de la caché versionada de GET /api/products/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='catalogo', password='clave-segura-123')
+        cls.product = Product.objects.create(name='Lámpara', price=decimal.Decimal('19.90'), stock=5)
+
+    def setUp(self):
+        get_catalog_cache().clear()
+
+    def test_repeated_reads_are_served_from_cache(self):
+        """La segunda lectura idéntica no consulta la base de datos."""
+        self.client.get('/api/products/')
+        self.client.get(f'/api/products/{self.product.id}/')
+
+        with self.assertNumQueries(0):
+            list_response = self.client.get('/api/products/')
+            detail_response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(list_response.data['results'][0]['name'], 'Lámpara')
+        self.assertEqual(detail_response.data['name'], 'Lámpara')
+
+    def test_model_save_invalidates_cache(self):
+        """Guardar un producto invalida inmediatamente las respuestas cacheadas."""
+        self.client.get(f'/api/products/{self.product.id}/')
+
+        self.product.name = 'Lámpara LED'
+        self.product.save()
+
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.data['name'], 'Lámpara LED')
+
+    def test_api_writes_invalidate_cache(self):
+        """Crear y eliminar productos vía API invalida el listado y el detalle."""
+        self.client.get('/api/products/')
+        self.client.get(f'/api/products/{self.product.id}/')
+        self.client.force_authenticate(self.user)
+
+        self.client.post('/api/products/', {'name': 'Mesa', 'price': '99.00', 'stock': 2})
+        names = [p['name'] for p in self.client.get('/api/products/').data['results']]
+        self.assertIn('Mesa', names)
+
+        self.client.delete(f'/api/products/{self.product.id}/')
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        """Distintos parámetros de consulta no comparten entrada de caché."""
+        Product.objects.create(name='Repisa', price=decimal.Decimal('30.00'), stock=3)
+        first_page = self.client.get('/api/products/?page_size=1')
+        full_page = self.client.get('/api/products/')
+        self.assertEqual(len(first_page.data['results']), 1)
+        self.assertEqual(len(full_page.data['results']), 2)
+
+
+class ProductConditionalGetTest(APITestCase):
+    """
+    Pruebas de ETag / Last-Modified en GET /api/products/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Cojín', price=decimal.Decimal('12.00'), stock=8)
+
+    def setUp(self):
+        get_catalog_cache().clear()
+
+    def test_warm_conditional_get_needs_no_queries(self):
+        """Con la caché caliente, un GET condicional vigente responde 304 sin queries."""
+        etag = self.client.get('/api/products/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_update_invalidates_etag(self):
+        """Al actualizar el producto el ETag anterior deja de ser válido."""
+        url = f'/api/products/{self.product.id}/'
+        etag = self.client.get(url)['ETag']
+
+        time.sleep(0.001)
+        self.product.price = decimal.Decimal('10.00')
+        self.product.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['price'], '10.00')
+
+
+class ProductStockActionTest(APITestCase):
+    """
+    Pruebas de las acciones de stock de ProductViewSet.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='bodega', password='clave-segura-123')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_increase_stock_reactivates_sold_out_product(self):
+        """Sumar stock a un producto agotado lo vuelve a activar."""
+        product = Product.objects.create(name='Taza', price=decimal.Decimal('4.50'), stock=0, is_active=False)
+        response = self.client.post(f'/api/products/{product.id}/increase_stock/', {'amount': 7})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stock'], 7)
+        self.assertTrue(response.data['is_active'])
+
+    def test_increase_stock_keeps_manually_disabled_product(self):
+        """Un producto desactivado con stock sigue inactivo al sumar stock."""
+        product = Product.objects.create(name='Plato', price=decimal.Decimal('6.00'), stock=3, is_active=False)
+        response = self.client.post(f'/api/products/{product.id}/increase_stock/', {'amount': 2})
+        self.assertEqual(response.data['stock'], 5)
+        self.assertFalse(response.data['is_active'])
+
+    def test_increase_stock_rejects_non_positive_amount(self):
+        """La cantidad a sumar debe ser positiva."""
+        product = Product.objects.create(name='Vaso', price=decimal.Decimal('2.00'), stock=1)
+        response = self.client.post(f'/api/products/{product.id}/increase_stock/', {'amount': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_mark_sold_out(self):
+        """Solo un producto sin stock puede marcarse como agotado."""
+        in_stock = Product.objects.create(name='Jarra', price=decimal.Decimal('9.00'), stock=2)
+        response = self.client.put(f'/api/products/{in_stock.id}/mark_sold_out/')
+        self.assertEqual(response.status_code, 400)
+
+        empty = Product.objects.create(name='Bandeja', price=decimal.Decimal('9.00'), stock=0)
+        response = self.client.put(f'/api/products/{empty.id}/mark_sold_out/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['is_active'])
+
+    def test_create_with_negative_stock_is_rejected(self):
+        """El stock inicial negativo se rechaza con 400."""
+        response = self.client.post('/api/products/', {'name': 'Error', 'price': '1.00', 'stock': -1})
+        self.assertEqual(response.status_code, 400)
+
+
+class ProductStockDeltaTest(TestCase):
+    """
+    Pruebas de ProductQuerySet.apply_stock_deltas.
+    """
+
+    def setUp(self):
+        self.first = Product.objects.create(name='A', price=decimal.Decimal('1.00'), stock=5)
+        self.second = Product.objects.create(name='B', price=decimal.Decimal('1.00'), stock=1)
+
+    def test_applies_all_deltas_in_one_update(self):
+        """Descuentos y devoluciones se aplican con un único UPDATE."""
+        with CaptureQueriesContext(connection) as ctx:
+            Product.objects.apply_stock_deltas({self.first.id: 5, self.second.id: -2})
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.stock, self.first.is_active), (0, False))
+        self.assertEqual(self.second.stock, 3)
+
+    def test_insufficient_stock_rolls_back_every_line(self):
+        """Si una línea no alcanza, ningún producto queda modificado."""
+        with self.assertRaises(InsufficientStock) as ctx:
+            Product.objects.apply_stock_deltas({self.first.id: 2, self.second.id: 4})
+        self.assertEqual(ctx.exception.product_ids, [self.second.id])
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.stock, 5)
+
+
+class ProductStockConcurrencyTest(TransactionTestCase):
+    """
+    Incrementos concurrentes de stock desde varios hilos contra la base de datos real.
+    """
+
+    def test_concurrent_increments_are_not_lost(self):
+        product = Product.objects.create(name='Caja', price=decimal.Decimal('3.00'), stock=0)
+
+        def increase():
+            try:
+                Product.objects.filter(pk=product.pk).increase_stock(1)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(increase) for _ in range(40)]:
+                future.result()
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 40)
+
+
+class ProductImportTest(APITestCase):
+    """
+    Pruebas de la importación masiva POST /api/products/import/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='proveedor', password='clave-segura-123')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _upload(self, name, content, query=''):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(f'/api/products/import/{query}', {'file': upload}, format='multipart')
+
+    def test_csv_import_creates_updates_and_reports_errors(self):
+        """Crea filas nuevas, actualiza por id y devuelve los errores por línea."""
+        existing = Product.objects.create(name='Viejo', price=decimal.Decimal('1.00'), stock=1)
+        content = (
+            'id,name,description,price,stock\n'
+            f'{existing.id},Renovado,,15.00,4\n'
+            ',Nuevo,Con descripción,20.00,0\n'
+            ',Sin precio,,,3\n'
+            ',Negativo,,5.00,-2\n'
+        )
+        response = self._upload('catalogo.csv', content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        self.assertIn('price', response.data['errors'][0]['errors'])
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.price, existing.stock), ('Renovado', decimal.Decimal('15.00'), 4))
+        new = Product.objects.get(name='Nuevo')
+        self.assertFalse(new.is_active) # stock 0 => inactivo, igual que perform_create
+
+    def test_ndjson_import_in_batches(self):
+        """Las filas se escriben en lotes del tamaño pedido y las líneas inválidas se reportan."""
+        lines = [json.dumps({'name': f'P{i}', 'price': '2.50', 'stock': 1}) for i in range(5)]
+        lines.insert(2, '{no es json')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._upload('catalogo.ndjson', '\n'.join(lines), query='?batch_size=2')
+
+        self.assertEqual(response.data['imported'], 5)
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3) # lotes de 2 + 2 + 1
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_update_keeps_columns_missing_from_the_row(self):
+        """Una celda vacía o una columna ausente no pisa el valor actual ni reactiva productos retirados."""
+        retired = Product.objects.create(
+            name='Retirado', description='Descripción original', price=decimal.Decimal('3.00'), stock=2, is_active=False,
+        )
+        response = self._upload('catalogo.csv', f'id,name,description,price,stock\n{retired.id},Retirado v2,,4.00,8\n')
+
+        self.assertEqual(response.data['imported'], 1)
+        retired.refresh_from_db()
+        self.assertEqual((retired.name, retired.price, retired.stock), ('Retirado v2', decimal.Decimal('4.00'), 8))
+        self.assertEqual(retired.description, 'Descripción original')
+        self.assertFalse(retired.is_active)
+
+    def test_update_with_stock_zero_deactivates(self):
+        """stock 0 en la fila deja el producto inactivo; sin la columna stock, stock e is_active no cambian."""
+        first = Product.objects.create(name='Uno', price=decimal.Decimal('1.00'), stock=5)
+        second = Product.objects.create(name='Dos', price=decimal.Decimal('1.00'), stock=5)
+        lines = [
+            json.dumps({'id': first.id, 'name': 'Uno', 'price': '1.00', 'stock': 0}),
+            json.dumps({'id': second.id, 'name': 'Dos', 'price': '2.00'}),
+        ]
+        self._upload('catalogo.ndjson', '\n'.join(lines))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.stock, first.is_active), (0, False))
+        self.assertEqual((second.stock, second.is_active, second.price), (5, True, decimal.Decimal('2.00')))
+
+    def test_update_without_stock_keeps_explicit_is_active(self):
+        """Una fila con id, sin stock y con is_active reactiva el producto sin tocar su stock."""
+        retired = Product.objects.create(name='Pausado', price=decimal.Decimal('1.00'), stock=10, is_active=False)
+        line = json.dumps({'id': retired.id, 'name': 'Pausado', 'price': '1.00', 'is_active': True})
+        self.assertEqual(self._upload('catalogo.ndjson', line).data['imported'], 1)
+
+        retired.refresh_from_db()
+        self.assertEqual((retired.stock, retired.is_active), (10, True))
+
+    def test_repeated_ids_are_counted_per_row(self):
+        """`imported` cuenta cada fila válida, se repita el id en el mismo lote o en otro; gana la última."""
+        existing = Product.objects.create(name='Base', price=decimal.Decimal('1.00'), stock=1)
+        lines = [json.dumps({'id': existing.id, 'name': f'Versión {i}', 'price': '1.00', 'stock': 1}) for i in range(3)]
+        response = self._upload('catalogo.ndjson', '\n'.join(lines), query='?batch_size=2')
+
+        self.assertEqual(response.data['imported'], 3)
+        existing.refresh_from_db()
+        self.assertEqual(existing.name, 'Versión 2')
+
+    def test_rejects_unknown_format(self):
+        """Un archivo sin formato reconocible se rechaza con 400."""
+        response = self._upload('catalogo.txt', 'name\nx\n')
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        """La importación no está disponible para usuarios anónimos."""
+        self.client.force_authenticate(None)
+        self.assertEqual(self._upload('catalogo.csv', 'name\nx\n').status_code, 401)
+
+
+class ProductSparseFieldsTest(APITestCase):
+    """
+    Pruebas de ?fields= / ?omit= en el catálogo: menos campos y menos columnas en el SELECT.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.create(name='Lámpara', description='Texto extenso ' * 200, price=decimal.Decimal('20.00'), stock=4)
+
+    def _get(self, query):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/products/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0], ctx.captured_queries[-1]['sql']
+
+    def test_fields_limits_payload_and_columns(self):
+        product, sql = self._get('?fields=id,name')
+        self.assertEqual(product, {'id': product['id'], 'name': 'Lámpara'})
+        self.assertNotIn('"description"', sql)
+
+    def test_omit_excludes_field(self):
+        product, sql = self._get('?omit=description')
+        self.assertNotIn('description', product)
+        self.assertIn('stock', product)
+        self.assertNotIn('"description"', sql)
+
+    def test_each_field_selection_is_cached_separately(self):
+        self.assertEqual(set(self._get('?fields=id')[0]), {'id'})
+        self.assertIn('description', self._get('')[0])
+
+
+class ProductFastListTest(APITestCase):
+    """
+    Prueba diferencial del camino rápido (API_FAST_LIST) en GET /api/products/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.create(name='Silla', description=None, price=decimal.Decimal('0.10'), stock=0, is_active=False)
+        Product.objects.create(name='Mesa "roble"', description='Ñandú €', price=decimal.Decimal('99999999.99'), stock=3)
+
+    def _get(self, url, fast):
+        get_catalog_cache().clear()
+        with self.settings(API_FAST_LIST=fast):
+            return self.client.get(url).content
+
+    def test_same_output_as_serializer(self):
+        for query in ['', '?fields=id,price', '?omit=description&page_size=1']:
+            with self.subTest(query=query):
+                url = f'/api/products/{query}'
+                self.assertEqual(self._get(url, fast=True), self._get(url, fast=False))
+
+
+class ProductAsyncViewTest(APITestCase):
+    """
+    GET /api/async/products/ debe responder lo mismo que el listado/detalle síncrono.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [
+            Product.objects.create(name=f'Producto {i}', description='Detalle', price=decimal.Decimal(f'{i}.25'), stock=i)
+            for i in range(5)
+        ]
+
+    def _results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_matches_sync_view(self):
+        for query in ['', '?page_size=2', '?fields=id,name&page_size=3']:
+            with self.subTest(query=query):
+                sync = self._results(f'/api/products/{query}')
+                async_ = self._results(f'/api/async/products/{query}')
+                self.assertEqual(async_['results'], sync['results'])
+
+    def test_cursor_walks_all_pages(self):
+        ids, url = [], '/api/async/products/?page_size=2'
+        while url:
+            page = self._results(url)
+            ids += [product['id'] for product in page['results']]
+            url = page['next']
+        self.assertEqual(ids, [product.id for product in self.products])
+
+    async def test_retrieve_and_not_found(self):
+        product = self.products[0]
+        response = await self.async_client.get(f'/api/async/products/{product.id}/')
+        expected = await sync_to_async(self.client.get)(f'/api/products/{product.id}/')
+        self.assertEqual(response.json(), expected.json())
+
+        for pk in [0, 'abc']:
+            response = await self.async_client.get(f'/api/async/products/{pk}/')
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {'detail': 'No Product matches the given query.'})
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/async/products/?cursor=xyz')
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductSearchTest(APITestCase):
+    """
+    Pruebas de GET /api/products/search/ con el motor de la base de pruebas
+    (FTS5 en SQLite, FULLTEXT en MySQL) y con el respaldo icontains.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lamp = Product.objects.create(
+            name='Lámpara de escritorio', description='Luz cálida regulable', price=decimal.Decimal('25.00'), stock=4)
+        cls.desk = Product.objects.create(
+            name='Escritorio de roble', description='Mesa amplia para lámpara', price=decimal.Decimal('150.00'), stock=2)
+        cls.chair = Product.objects.create(
+            name='Silla gamer', description='Respaldo reclinable', price=decimal.Decimal('90.00'), stock=0, is_active=False)
+
+    def setUp(self):
+        get_catalog_cache().clear()
+
+    def search_ids(self, **params):
+        response = self.client.get('/api/products/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [product['id'] for product in response.data['results']]
+
+    def test_name_matches_rank_above_description_matches(self):
+        """Los dos productos mencionan 'lámpara'; el que la tiene en el nombre va primero."""
+        self.assertEqual(self.search_ids(q='lámpara'), [self.lamp.id, self.desk.id])
+        self.assertEqual(self.search_ids(q='escritorio roble'), [self.desk.id, self.lamp.id])
+
+    def test_results_include_relevance(self):
+        response = self.client.get('/api/products/search/', {'q': 'lámpara', 'fields': 'id,relevance'})
+        first, second = response.data['results']
+        self.assertEqual(set(first), {'id', 'relevance'})
+        self.assertGreater(first['relevance'], second['relevance'])
+
+    def test_is_active_filter(self):
+        self.assertEqual(self.search_ids(q='silla'), [self.chair.id])
+        self.assertEqual(self.search_ids(q='silla', is_active='true'), [])
+        self.assertEqual(self.search_ids(q='silla lámpara', is_active='false'), [self.chair.id])
+
+    def test_page_size_limits_results(self):
+        self.assertEqual(self.search_ids(q='lámpara', page_size=1), [self.lamp.id])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get('/api/products/search/').status_code, 400)
+        self.assertEqual(self.search_ids(q='"*) OR -'), [])
+
+    def test_index_follows_writes(self):
+        """El índice refleja creaciones, cambios de nombre y eliminaciones (también por update())."""
+        Product.objects.filter(pk=self.chair.pk).update(name='Sillón reclinable')
+        lamp = Product.objects.create(name='Lámpara de pie', price=decimal.Decimal('40.00'), stock=1)
+        self.desk.delete()
+
+        self.assertEqual(self.search_ids(q='silla'), [])
+        self.assertEqual(self.search_ids(q='sillón'), [self.chair.id])
+        self.assertEqual(sorted(self.search_ids(q='lámpara')), sorted([self.lamp.id, lamp.id]))
+
+    def test_search_backend_is_indexed(self):
+        """SQLite y MySQL usan su índice de texto; el respaldo icontains es solo para otros motores."""
+        backend = get_search_backend(connection)
+        if connection.vendor in ('sqlite', 'mysql'):
+            self.assertNotIsInstance(backend, ContainsSearch)
+
+    def test_contains_fallback_ranks_like_the_index(self):
+        for text in ('lámpara', 'escritorio roble'):
+            with self.subTest(text):
+                indexed = [pk for pk, _ in search_products(text)]
+                fallback = [pk for pk, _ in search_products(text, backend=ContainsSearch())]
+                self.assertEqual(indexed, fallback)
+
+    def test_mysql_relevance_weights_name_twice(self):
+        """Sin MySQL en los tests se revisa la consulta: el WHERE usa el índice conjunto y el nombre pesa 2."""
+        cursor = mock.MagicMock()
+        cursor.fetchall.return_value = [(7, 1.5)]
+        fake_connection = mock.MagicMock()
+        fake_connection.ops.quote_name.side_effect = lambda name: f'`{name}`'
+        fake_connection.cursor.return_value.__enter__.return_value = cursor
+
+        results = MySQLFullTextSearch().rank(fake_connection, ['taza', 'roja'], True, 5)
+
+        sql, params = cursor.execute.call_args.args
+        self.assertIn('2 * MATCH (name) AGAINST (%s IN NATURAL LANGUAGE MODE) + MATCH (description)', sql)
+        self.assertIn('WHERE MATCH (name, description) AGAINST', sql)
+        self.assertEqual(params, ['taza roja', 'taza roja', 'taza roja', True, 5])
+        self.assertEqual(results, [(7, 1.5)])
+
+    def test_parse_terms(self):
+        self.assertEqual(parse_terms('Lámpara  "de" lámpara* OR -pie'), ['lámpara', 'de', 'or', 'pie'])
+
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import SimpleRouter
-from products.views import ProductViewSet
+from products.views import ProductAsyncView, ProductViewSet
 
 router = SimpleRouter()
 router.register(r"products", ProductViewSet, basename="products")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/products/", ProductAsyncView.as_view(), name="products-async-list"),
+    path("async/products/<str:pk>/", ProductAsyncView.as_view(), name="products-async-detail"),
 ]
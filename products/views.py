@@ -2,22 +2,35 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
 from django.db import transaction
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer
 
+from django_crud_api.async_views import AsyncReadOnlyView
+from django_crud_api.mixins import ConditionalGetMixin, FastListMixin, OptimizedQuerysetMixin
+from django_crud_api.serializers import DYNAMIC_FIELDS_PARAMETERS
+from orders.signals import defer_total_updates
+from .cache import CatalogCacheMixin
+from .imports import ProductImporter, detect_format, read_rows
 from .models import Product
-from .serializers import ProductSerializer
-from products import serializers
+from .search import search_products
+from .serializers import (
+    ProductSearchQuerySerializer, ProductSearchResultSerializer, ProductSerializer, StockIncreaseSerializer,
+)
+from rest_framework import serializers
 
 @extend_schema_view(
     list=extend_schema(
         summary="Listar productos",
         description="Listado público de productos disponibles.",
+        parameters=DYNAMIC_FIELDS_PARAMETERS,
         tags=["Products"]
     ),
     retrieve=extend_schema(
         summary="Obtener producto",
         description="Detalle de producto por ID.",
+        parameters=DYNAMIC_FIELDS_PARAMETERS,
         tags=["Products"]
     ),
     create=extend_schema(
@@ -45,17 +58,33 @@ from products import serializers
     tags=["Products"],
     description="CRUD completo de productos con lógica de stock, visibilidad (activo/inactivo) y acciones personalizadas."
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CatalogCacheMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    ordering = ('id',)
+    cached_actions = ('list', 'retrieve', 'search')
+    optimized_actions = ('list', 'retrieve', 'search')
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def get_serializer_class(self):
+        if self.action == 'search':
+            return ProductSearchResultSerializer
+        return super().get_serializer_class()
+
+    # Los validadores HTTP también se cachean por versión del catálogo, así un
+    # GET condicional repetido se responde sin tocar la base de datos.
+    def get_list_validators(self, request):
+        return self.cached_value(request, 'validators', super().get_list_validators)
+
+    def get_detail_validators(self, request):
+        return self.cached_value(request, 'validators', super().get_detail_validators)
+
     def perform_create(self, serializer):
         stock = serializer.validated_data.get('stock', 0)
         if stock < 0:
@@ -76,22 +105,122 @@ class ProductViewSet(viewsets.ModelViewSet):
             serializer.validated_data['is_active'] = True
         serializer.save()
 
+    def perform_destroy(self, instance):
+        # Los items del producto se eliminan en cascada: un solo UPDATE recalcula las órdenes afectadas.
+        with defer_total_updates():
+            instance.delete()
+
     @extend_schema(
         summary="Marcar producto como agotado",
         description="Marca un producto como inactivo si su stock es cero.",
+        request=None,
+        responses=ProductSerializer,
         tags=["Products"]
     )
     @action(detail=True, methods=['put'])
     def mark_sold_out(self, request, pk=None):
-        # ... (sin cambios en la lógica)
-        pass
+        product = self.get_object()
+        # UPDATE condicional: solo afecta la fila si el stock sigue en cero al escribir.
+        if not Product.objects.filter(pk=product.pk).mark_sold_out():
+            raise serializers.ValidationError({"stock": "Solo se puede marcar como agotado un producto sin stock."})
+        product.refresh_from_db()
+        return Response(self.get_serializer(product).data)
 
     @extend_schema(
         summary="Incrementar stock del producto",
         description="Suma una cantidad específica al stock actual del producto.",
+        request=StockIncreaseSerializer,
+        responses=ProductSerializer,
         tags=["Products"]
     )
     @action(detail=True, methods=['post'])
     def increase_stock(self, request, pk=None):
-        # ... (sin cambios en la lógica)
-        pass
+        product = self.get_object()
+        payload = StockIncreaseSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        # stock = stock + n en la base de datos: incrementos concurrentes no se pisan.
+        Product.objects.filter(pk=product.pk).increase_stock(payload.validated_data['amount'])
+        product.refresh_from_db()
+        return Response(self.get_serializer(product).data)
+
+    @extend_schema(
+        summary="Importar productos (CSV / NDJSON)",
+        description=(
+            "Carga masiva desde un archivo CSV o NDJSON (campo 'file'). Las filas se validan y se "
+            "escriben por lotes; las que traen el id de un producto existente actualizan solo las columnas "
+            "presentes (una celda vacía conserva el valor actual). Un stock de 0 deja el producto inactivo. "
+            "Devuelve la cantidad de filas importadas y los errores por línea."
+        ),
+        request={'multipart/form-data': inline_serializer(
+            name='ProductImportRequest',
+            fields={'file': serializers.FileField()},
+        )},
+        responses=inline_serializer(
+            name='ProductImportResult',
+            fields={
+                'imported': serializers.IntegerField(),
+                'error_count': serializers.IntegerField(),
+                'errors': serializers.ListField(child=serializers.DictField()),
+            },
+        ),
+        tags=["Products"]
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            raise serializers.ValidationError({"file": "Debe adjuntar un archivo CSV o NDJSON."})
+        file_format = detect_format(uploaded_file, request.query_params.get('type'))
+        if file_format is None:
+            raise serializers.ValidationError({"file": "Formato no soportado. Use CSV o NDJSON (?type=csv|ndjson)."})
+
+        batch_size = settings.PRODUCT_IMPORT_BATCH_SIZE
+        try:
+            batch_size = min(max(int(request.query_params['batch_size']), 1), batch_size)
+        except (KeyError, ValueError):
+            pass
+
+        importer = ProductImporter(batch_size=batch_size, max_errors=settings.PRODUCT_IMPORT_MAX_ERRORS)
+        return Response(importer.run(read_rows(uploaded_file, file_format)))
+
+    @extend_schema(
+        summary="Buscar productos",
+        description=(
+            "Búsqueda de texto en el nombre y la descripción, ordenada por relevancia (el nombre pesa más). "
+            "Usa el índice FULLTEXT en MySQL y FTS5 en SQLite. Devuelve como máximo page_size resultados, sin cursor."
+        ),
+        parameters=[ProductSearchQuerySerializer, *DYNAMIC_FIELDS_PARAMETERS],
+        responses=inline_serializer(
+            name='ProductSearchResponse',
+            fields={'results': ProductSearchResultSerializer(many=True)},
+        ),
+        tags=["Products"]
+    )
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        return self.cached_response(self.search_response, request)
+
+    def search_response(self, request):
+        params = ProductSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ranked = search_products(
+            params.validated_data['q'],
+            is_active=params.validated_data['is_active'],
+            limit=min(params.validated_data['page_size'], settings.API_MAX_PAGE_SIZE),
+        )
+        # Una segunda query trae las filas completas; el orden es el de la búsqueda.
+        products = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+        results = []
+        for pk, relevance in ranked:
+            product = products.get(pk)
+            if product is not None:
+                product.relevance = relevance
+                results.append(product)
+        return Response({'results': self.get_serializer(results, many=True).data})
+
+
+class ProductAsyncView(AsyncReadOnlyView):
+    """GET /api/async/products/ y /api/async/products/<id>/: lectura pública del catálogo con el ORM async."""
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    ordering = ProductViewSet.ordering